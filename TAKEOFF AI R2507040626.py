@@ -2,7 +2,8 @@
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox, simpledialog, colorchooser # Added colorchooser
-from PIL import Image, ImageTk
+from tkinter import font as tkfont
+from PIL import Image, ImageTk, ImageDraw
 import fitz  # PyMuPDF pour la manipulation de PDF
 import numpy as np
 import math
@@ -13,6 +14,11 @@ import json
 import csv
 from anthropic import Anthropic
 import time
+from collections import OrderedDict, deque
+import multiprocessing
+import hashlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 # Import for PDF Export (will be used later)
 # --- Importation conditionnelle pour éviter l'erreur si reportlab n'est pas installé ---
 try:
@@ -1158,7 +1164,1163 @@ Donnez une réponse concise et directement exploitable par un professionnel util
              return error_message
 
 
+# --- Géométrie d'accrochage (segments PDF en tableaux NumPy) ---
+
+EMPTY_SEGMENTS = np.empty((0, 4), dtype=np.float32) # Segments d'une page: (N, 4) float32 -> x0, y0, x1, y1 (points PDF)
+GRID_KEY_OFFSET = 1 << 20 # Cell coordinates are shifted to stay positive in the packed key
+GRID_KEY_STRIDE = 1 << 21
+
+
+def grid_cell_key(cx, cy):
+    """Combine les coordonnées de cellule (entiers ou tableaux) en une clé int64 unique."""
+    return (cx + GRID_KEY_OFFSET) * GRID_KEY_STRIDE + (cy + GRID_KEY_OFFSET)
+
+
+# Courbes de Bézier ('c'): aplaties en segments, avec points d'accrochage propres aux arcs
+MIN_DISPLAY_RESOLUTION_FACTOR = 1.5 # Pages are never displayed below 1.5 pixel per PDF point
+CURVE_FLATNESS_PX = 0.5 # Max gap between a curve and its segments, at the minimum display resolution
+CURVE_TOLERANCE_PTS = CURVE_FLATNESS_PX / MIN_DISPLAY_RESOLUTION_FACTOR
+MAX_CURVE_SUBDIVISIONS = 64
+CURVE_POINT_CENTER, CURVE_POINT_QUADRANT, CURVE_POINT_END = 0, 1, 2 # Kinds of the curve snap points
+CURVE_POINT_TYPES = ("arc_center", "arc_quadrant", "endpoint") # Snap type reported for each kind
+EMPTY_CURVES = {"start": 0, "raw_count": 0, "points": np.empty((0, 2), dtype=np.float32), "kinds": np.empty(0, dtype=np.int8)}
+
+
+def cubic_bezier_points(controls, t):
+    """Évalue des courbes de Bézier cubiques (C, 4, 2) aux paramètres t (T,); retourne (C, T, 2)."""
+    t = np.asarray(t, dtype=np.float64)
+    u = 1.0 - t
+    basis = np.stack((u**3, 3 * u**2 * t, 3 * u * t**2, t**3), axis=1) # (T, 4) Bernstein polynomials
+    return np.einsum('tk,ckd->ctd', basis, controls)
+
+
+def flatten_bezier_curves(controls, tolerance_pts=CURVE_TOLERANCE_PTS):
+    """Aplatit des courbes de Bézier cubiques (C, 4, 2) en segments (M, 4) float32.
+       Le nombre de subdivisions de chaque courbe est adapté à sa courbure: avec n pas réguliers,
+       l'écart à la courbe reste sous 3/4 * max|P0 - 2P1 + P2| / n², donc sous la tolérance.
+       Les courbes sont traitées par groupes de même n, sans boucle Python par courbe."""
+    if not len(controls):
+        return EMPTY_SEGMENTS
+    second_diff = np.maximum(
+        np.hypot(*(controls[:, 0] - 2 * controls[:, 1] + controls[:, 2]).T),
+        np.hypot(*(controls[:, 1] - 2 * controls[:, 2] + controls[:, 3]).T))
+    counts = np.clip(np.ceil(np.sqrt(0.75 * second_diff / tolerance_pts)), 1, MAX_CURVE_SUBDIVISIONS).astype(np.int64)
+    chunks = []
+    for n in np.unique(counts).tolist():
+        points = cubic_bezier_points(controls[counts == n], np.linspace(0.0, 1.0, n + 1))
+        chunks.append(np.concatenate((points[:, :-1], points[:, 1:]), axis=2).reshape(-1, 4))
+    return np.concatenate(chunks).astype(np.float32)
+
+
+def curve_snap_points(controls, tolerance_pts=CURVE_TOLERANCE_PTS):
+    """Points d'accrochage de courbes de Bézier cubiques (C, 4, 2): extrémités de chaque courbe, et,
+       pour celles qui approchent un arc de cercle, le centre et les points de quadrant (0°, 90°, 180°, 270°)
+       compris dans l'arc. Retourne (points (K, 2) float32, types (K,) int8), sans doublons."""
+    if not len(controls):
+        return EMPTY_CURVES["points"], EMPTY_CURVES["kinds"]
+    samples = cubic_bezier_points(controls, (0.0, 0.25, 0.5, 0.75, 1.0))
+    # Circle through the start, middle and end of the curve (relative to the start for precision)
+    origin = samples[:, 0]
+    bx, by = (samples[:, 2] - origin).T
+    cx, cy = (samples[:, 4] - origin).T
+    denom = 2 * (bx * cy - by * cx)
+    is_arc = np.abs(denom) > 1e-9 # Straight "curves" have no circle
+    safe_denom = np.where(is_arc, denom, 1.0)
+    b_sq, c_sq = bx**2 + by**2, cx**2 + cy**2
+    center = origin + np.stack(((cy * b_sq - by * c_sq) / safe_denom, (bx * c_sq - cx * b_sq) / safe_denom), axis=1)
+    radius = np.hypot(*(samples[:, 0] - center).T)
+    # The quarter points must lie on the same circle (ellipses and S-curves are not arcs)
+    radial_error = np.abs(np.hypot(samples[:, 1::2, 0] - center[:, None, 0],
+                                   samples[:, 1::2, 1] - center[:, None, 1]) - radius[:, None]).max(axis=1)
+    is_arc &= (radial_error <= np.maximum(tolerance_pts, 0.002 * radius)) & (radius < 1e5)
+
+    # Angular span of the arc, from its start through its middle to its end
+    angles = np.arctan2(samples[:, [0, 2, 4], 1] - center[:, None, 1], samples[:, [0, 2, 4], 0] - center[:, None, 0])
+    half_sweeps = (np.diff(angles, axis=1) + np.pi) % (2 * np.pi) - np.pi
+    sweep = half_sweeps.sum(axis=1)
+    quadrants = np.arange(4) * (np.pi / 2)
+    offset = (np.sign(sweep)[:, None] * (quadrants[None, :] - angles[:, :1])) % (2 * np.pi)
+    on_arc = is_arc[:, None] & (offset <= np.abs(sweep)[:, None] + 1e-9)
+    quadrant_points = center[:, None, :] + radius[:, None, None] * np.stack((np.cos(quadrants), np.sin(quadrants)), axis=1)
+
+    points = np.concatenate((center[is_arc], quadrant_points[on_arc], samples[:, 0], samples[:, 4]))
+    kinds = np.concatenate((np.full(int(is_arc.sum()), CURVE_POINT_CENTER), np.full(int(on_arc.sum()), CURVE_POINT_QUADRANT),
+                            np.full(2 * len(controls), CURVE_POINT_END)))
+    # Curves of one circle share their centre and their junctions: keep each point once per kind
+    rows = np.unique(np.column_stack((np.round(points, 2), kinds)), axis=0)
+    return rows[:, :2].astype(np.float32), rows[:, 2].astype(np.int8)
+
+
+SEGMENT_MERGE_TOLERANCE_PTS = 0.25 # Offset / gap under which two segments are on the same line
+SEGMENT_MERGE_ANGLE_TOLERANCE = 1e-4 # Radians (0.1 pt of drift over 1000 pt)
+
+
+def normalize_segments(segments, tolerance_pts=SEGMENT_MERGE_TOLERANCE_PTS, angle_tolerance=SEGMENT_MERGE_ANGLE_TOLERANCE):
+    """Supprime les segments en double et fusionne les segments colinéaires qui se chevauchent ou se touchent.
+       Chaque segment reçoit une clé de droite (angle et distance à l'origine quantifiés); après un tri par
+       clé puis par abscisse le long de la droite, les intervalles qui se recouvrent (à la tolérance près)
+       sont fusionnés par un maximum cumulé, sans boucle Python. Retourne un tableau (M, 4) float32, M <= N."""
+    if len(segments) < 2:
+        return segments
+    seg = np.asarray(segments, dtype=np.float64)
+    p0, p1 = seg[:, 0:2], seg[:, 2:4]
+    delta = p1 - p0
+    angle = np.arctan2(delta[:, 1], delta[:, 0]) % np.pi # Direction without orientation, in [0, pi)
+    angle_bin = np.floor(angle / angle_tolerance).astype(np.int64)
+    # Signed distance from the origin to the segment's own line (the same for every piece of a line)
+    offset = np.cos(angle) * p0[:, 1] - np.sin(angle) * p0[:, 0]
+    offset_bin = np.floor(offset / tolerance_pts).astype(np.int64)
+    line_angle = (angle_bin + 0.5) * angle_tolerance # One direction shared by the whole bin for the abscissas
+    ux, uy = np.cos(line_angle), np.sin(line_angle)
+
+    # Interval covered by each segment along its line
+    s0 = ux * p0[:, 0] + uy * p0[:, 1]
+    s1 = ux * p1[:, 0] + uy * p1[:, 1]
+    start, stop = np.minimum(s0, s1), np.maximum(s0, s1)
+
+    order = np.lexsort((start, offset_bin, angle_bin))
+    angle_bin, offset_bin, start, stop = angle_bin[order], offset_bin[order], start[order], stop[order]
+    new_line = np.ones(len(order), dtype=bool)
+    new_line[1:] = (angle_bin[1:] != angle_bin[:-1]) | (offset_bin[1:] != offset_bin[:-1])
+    # Both ends must also lie on the line of the previous segment (bins only approximate the line):
+    # a segment off that line starts a new group, and the overlap test restarts with it
+    prev, cur = order[:-1], order[1:]
+    normal = np.stack((-delta[prev, 1], delta[prev, 0]), axis=1) / np.maximum(np.hypot(delta[prev, 0], delta[prev, 1]), 1e-9)[:, None]
+    off_line = np.maximum(np.abs(np.einsum('ij,ij->i', p0[cur] - p0[prev], normal)),
+                          np.abs(np.einsum('ij,ij->i', p1[cur] - p0[prev], normal)))
+    new_group = new_line.copy()
+    new_group[1:] |= off_line > tolerance_pts
+    # Groups are laid end to end on one axis, so a single cumulative maximum covers every group
+    # without reaching across a group boundary
+    group_shift = (np.cumsum(new_group) - 1) * (2.0 * (np.abs(start).max() + np.abs(stop).max() + 1.0))
+    reach = np.maximum.accumulate(stop + group_shift)
+    new_run = new_group.copy()
+    new_run[1:] |= start[1:] + group_shift[1:] > reach[:-1] + tolerance_pts
+    if new_run.all():
+        return segments # Nothing to merge
+
+    run_starts = np.flatnonzero(new_run)
+    run_sizes = np.diff(np.append(run_starts, len(order)))
+    first = order[run_starts] # The first segment of a run carries the line (its exact direction, not the binned one)
+    run_start = start[run_starts]
+    run_stop = np.maximum.reduceat(stop, run_starts)
+    u = np.stack((ux[first], uy[first]), axis=1)
+    length = np.hypot(delta[first, 0], delta[first, 1])
+    direction = np.where(length[:, None] > 1e-9, delta[first] / np.maximum(length, 1e-9)[:, None], u)
+    direction *= np.where(np.einsum('ij,ij->i', direction, u) < 0, -1.0, 1.0)[:, None] # Oriented like u
+    direction /= np.einsum('ij,ij->i', direction, u)[:, None] # One unit of abscissa along u
+    base = np.einsum('ij,ij->i', p0[first], u) # Abscissa of the first segment's start
+    merged = np.hstack((p0[first] + (run_start - base)[:, None] * direction,
+                        p0[first] + (run_stop - base)[:, None] * direction))
+    single = run_sizes == 1
+    merged[single] = seg[first[single]] # Segments with nothing to merge are kept as extracted
+    return merged.astype(np.float32)
+
+
+def extract_page_segments(page, min_length_pts=3, curve_tolerance_pts=CURVE_TOLERANCE_PTS):
+    """Extrait les segments vectoriels tracés d'une page PDF dans un tableau (N, 4) float32.
+       Les segments plus courts que `min_length_pts` (bruit) sont filtrés par un masque vectorisé.
+       Les segments droits sont normalisés (doublons supprimés, morceaux colinéaires fusionnés, voir
+       normalize_segments) avant ce filtre, pour que les polylignes en petits morceaux ne soient pas perdues.
+       Les courbes ('c') sont aplaties et placées après les segments droits; retourne (segments, courbes)
+       où courbes = {"start": indice du premier segment de courbe, "raw_count": nombre de segments droits
+       avant normalisation, "points": (K, 2), "kinds": (K,)}."""
+    coords = [] # Flat x0, y0, x1, y1 sequence, converted to a contiguous array once per page
+    append = coords.extend
+    curve_coords = [] # Flat control points of the Bézier curves, 8 values per curve
+    append_curve = curve_coords.extend
+    # Use get_drawings() which extracts vector paths
+    for path in page.get_drawings():
+        # type 's' is stroke, 'f' is fill, 'fs' is fill then stroke
+        if path.get("type") not in ('s', 'fs'): # Only consider stroked paths for lines
+            continue
+        items = path.get("items")
+        if not items:
+            continue
+        for item in items:
+            op = item[0] # 'l' (line), 'c' (curve), 're' (rect), 'qu' (quad)
+            if op == 'l': # ('l', start Point, end Point)
+                p1, p2 = item[1], item[2]
+                append((p1.x, p1.y, p2.x, p2.y))
+            elif op == 're': # ('re', Rect, orientation)
+                rect = item[1]
+                if rect and rect.is_valid and not rect.is_empty:
+                    x0, y0, x1, y1 = rect.x0, rect.y0, rect.x1, rect.y1
+                    append((x0, y0, x1, y0, x1, y0, x1, y1, x1, y1, x0, y1, x0, y1, x0, y0))
+            elif op == 'c': # ('c', start Point, control Point, control Point, end Point)
+                p1, c1, c2, p2 = item[1], item[2], item[3], item[4]
+                append_curve((p1.x, p1.y, c1.x, c1.y, c2.x, c2.y, p2.x, p2.y))
+
+    segments = EMPTY_SEGMENTS
+    raw_count = 0
+    if coords:
+        segments = np.array(coords, dtype=np.float32).reshape(-1, 4)
+        min_length_sq = np.float32(min_length_pts ** 2)
+        deltas = segments[:, 2:4] - segments[:, 0:2]
+        raw_count = int(np.count_nonzero(np.einsum('ij,ij->i', deltas, deltas) >= min_length_sq))
+        segments = normalize_segments(segments)
+        deltas = segments[:, 2:4] - segments[:, 0:2]
+        segments = segments[np.einsum('ij,ij->i', deltas, deltas) >= min_length_sq]
+
+    curves = dict(EMPTY_CURVES, start=len(segments), raw_count=raw_count)
+    if curve_coords:
+        controls = np.array(curve_coords, dtype=np.float64).reshape(-1, 4, 2)
+        # Noise filter on the length of the control polygon (the pieces of a small arc can be short)
+        polygon_length = np.hypot(*np.diff(controls, axis=1).transpose(2, 0, 1)).sum(axis=1)
+        controls = controls[polygon_length >= min_length_pts]
+        if len(controls):
+            segments = np.concatenate((segments, flatten_bezier_curves(controls, curve_tolerance_pts)))
+            curves["points"], curves["kinds"] = curve_snap_points(controls, curve_tolerance_pts)
+    return np.ascontiguousarray(segments, dtype=np.float32), curves
+
+
+def extract_segments_worker(pdf_path, page_indices, min_length_pts=3):
+    """Extrait les segments d'un lot de pages dans un processus de travail, avec leurs intersections.
+       Chaque processus ouvre son propre document fitz; retourne
+       [(page_index, tableau (N, 4), courbes, intersections (K, 2)), ...]."""
+    results = []
+    document = fitz.open(pdf_path)
+    try:
+        for page_index in page_indices:
+            try:
+                page_lines, curves = extract_page_segments(document[page_index], min_length_pts)
+                intersections = compute_page_intersections(page_lines)
+            except Exception as e:
+                print(f"Avertissement: Erreur lors de l'extraction des dessins de la page {page_index + 1}: {str(e)}")
+                page_lines, curves = EMPTY_SEGMENTS, EMPTY_CURVES
+                intersections = np.empty((0, 2), dtype=np.float64)
+            results.append((page_index, page_lines, curves, intersections))
+    finally:
+        document.close()
+    return results
+
+
+class GeometryCache:
+    """Cache disque des segments extraits, sous get_app_data_path()/geometry_cache.
+       Un dossier par document, nommé d'après le hash du contenu du PDF et les paramètres d'extraction;
+       un fichier .npy par page, relu en mémoire mappée (mmap) sans repasser par get_drawings,
+       un petit fichier .npz des points d'accrochage des courbes et un .npy des intersections
+       (écrit à part: les intersections d'une page extraite à la demande arrivent plus tard).
+       La taille totale du cache est bornée: les documents utilisés le moins récemment sont évincés (evict)."""
+
+    FORMAT_VERSION = 3 # Bump when the extraction output changes, invalidating old entries
+    HASH_CHUNK_SIZE = 1 << 20
+    MAX_TOTAL_BYTES = 1 << 30 # All documents together; beyond, the least recently used are removed
+
+    def __init__(self, pdf_path, min_length_pts):
+        self.directory = None
+        try:
+            content_hash = self.hash_file(pdf_path)
+            params_tag = f"v{self.FORMAT_VERSION}_min{min_length_pts:g}"
+            self.directory = os.path.join(self.root_directory(), f"{content_hash}_{params_tag}")
+            os.makedirs(self.directory, exist_ok=True)
+            os.utime(self.directory) # Last use of the document, for the LRU eviction
+        except Exception as e:
+            print(f"Avertissement: Cache de géométrie indisponible: {e}")
+            self.directory = None
+
+    @staticmethod
+    def root_directory():
+        return os.path.join(get_app_data_path(), "geometry_cache")
+
+    @classmethod
+    def evict(cls, keep=None, max_bytes=None):
+        """Supprime les dossiers de documents les moins récemment utilisés (date de modification du dossier)
+           jusqu'à ce que le cache tienne dans max_bytes; le dossier `keep` (document ouvert) est conservé."""
+        max_bytes = cls.MAX_TOTAL_BYTES if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        try:
+            with os.scandir(cls.root_directory()) as documents:
+                for document in documents:
+                    if not document.is_dir():
+                        continue
+                    size = sum(entry.stat().st_size for entry in os.scandir(document.path) if entry.is_file())
+                    entries.append((document.stat().st_mtime, size, document.path))
+                    total += size
+        except OSError as e:
+            print(f"Avertissement: Éviction du cache de géométrie impossible: {e}")
+            return
+        for _, size, directory in sorted(entries):
+            if total <= max_bytes:
+                break
+            if keep is not None and os.path.abspath(directory) == os.path.abspath(keep):
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+
+    @classmethod
+    def hash_file(cls, path):
+        """Hash SHA-256 du contenu du fichier (lu par blocs)."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def page_file(self, page_index):
+        return os.path.join(self.directory, f"page_{page_index:05d}.npy")
+
+    def curves_file(self, page_index):
+        return os.path.join(self.directory, f"page_{page_index:05d}_curves.npz")
+
+    def intersections_file(self, page_index):
+        return os.path.join(self.directory, f"page_{page_index:05d}_intersections.npy")
+
+    def load_page(self, page_index):
+        """Retourne (tableau (N, 4) mappé en lecture seule, courbes, intersections ou None) en cache pour la page, ou None."""
+        if self.directory is None:
+            return None
+        path = self.page_file(page_index)
+        curves_path = self.curves_file(page_index)
+        if not os.path.exists(path) or not os.path.exists(curves_path):
+            return None
+        try:
+            page_lines = np.asarray(np.load(path, mmap_mode='r')) # Plain ndarray view on the mapped file
+            with np.load(curves_path) as data:
+                curves = {"start": int(data["start"]), "raw_count": int(data["raw_count"]),
+                          "points": data["points"], "kinds": data["kinds"]}
+        except Exception as e:
+            print(f"Avertissement: Entrée de cache illisible ({path}): {e}")
+            return None
+        if page_lines.ndim != 2 or page_lines.shape[1] != 4 or page_lines.dtype != np.float32:
+            return None
+        intersections = None # Recomputed in the background when missing
+        intersections_path = self.intersections_file(page_index)
+        if os.path.exists(intersections_path):
+            try:
+                intersections = np.load(intersections_path)
+            except Exception as e:
+                print(f"Avertissement: Entrée de cache illisible ({intersections_path}): {e}")
+        return page_lines, curves, intersections
+
+    def save_page(self, page_index, page_lines, curves=EMPTY_CURVES, intersections=None):
+        """Écrit les segments et les courbes d'une page dans le cache (écriture atomique via des fichiers
+           temporaires; les courbes sont écrites en dernier, leur présence valide l'entrée)."""
+        if self.directory is None:
+            return
+        path = self.page_file(page_index)
+        curves_path = self.curves_file(page_index)
+        try:
+            with open(path + ".tmp", 'wb') as f:
+                np.save(f, np.ascontiguousarray(page_lines, dtype=np.float32))
+            os.replace(path + ".tmp", path)
+            with open(curves_path + ".tmp", 'wb') as f:
+                np.savez(f, start=curves["start"], raw_count=curves["raw_count"],
+                         points=curves["points"], kinds=curves["kinds"])
+            os.replace(curves_path + ".tmp", curves_path)
+        except Exception as e:
+            print(f"Avertissement: Impossible d'écrire le cache de la page {page_index + 1}: {e}")
+            return
+        if intersections is not None:
+            self.save_intersections(page_index, intersections)
+
+    def save_intersections(self, page_index, intersections):
+        """Écrit les intersections (K, 2) d'une page dans le cache."""
+        if self.directory is None:
+            return
+        path = self.intersections_file(page_index)
+        try:
+            with open(path + ".tmp", 'wb') as f:
+                np.save(f, np.asarray(intersections, dtype=np.float64))
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            print(f"Avertissement: Impossible d'écrire les intersections de la page {page_index + 1}: {e}")
+
+
+def open_geometry_cache(pdf_path, min_length_pts, page_count):
+    """Ouvre le cache de géométrie d'un PDF hors du thread Tk: hash du contenu, lecture des pages en cache
+       et éviction des documents les moins récemment utilisés.
+       Retourne (GeometryCache, {page_index: (segments, courbes, intersections ou None)})."""
+    cache = GeometryCache(pdf_path, min_length_pts)
+    cached_pages = {}
+    if cache.directory is not None:
+        for page_index in range(page_count):
+            cached = cache.load_page(page_index)
+            if cached is not None:
+                cached_pages[page_index] = cached
+        GeometryCache.evict(keep=cache.directory)
+    return cache, cached_pages
+
+
+class SegmentGridIndex:
+    """Index spatial (grille uniforme) des segments d'une page, en coordonnées PDF.
+
+    Chaque segment est enregistré dans toutes les cellules couvertes par sa boîte
+    englobante. Les entrées sont triées par cellule (table compacte de type CSR), et une
+    requête ne lit que les cellules touchées par le rayon de recherche, ce qui rend le
+    coût indépendant du nombre total de segments sur la page."""
+
+    MIN_CELL_SIZE = 4.0    # Points PDF
+    MAX_CELL_SIZE = 64.0   # Points PDF
+    MAX_CELLS_PER_SEGMENT = 256 # Au-delà, le segment est gardé dans la liste des "grands" segments
+
+    def __init__(self, segments, cell_size=None):
+        self.segments = np.asarray(segments, dtype=np.float32).reshape(-1, 4)
+        self.cell_size = cell_size or self.choose_cell_size(self.segments)
+        self.cell_entries = np.empty(0, dtype=np.int32) # Segment indices grouped by cell
+        self.cell_keys = np.empty(0, dtype=np.int64)
+        self.cell_starts = np.empty(0, dtype=np.int64)
+        self.cell_counts = np.empty(0, dtype=np.int64)
+        self.cell_slices = {} # {cell_key: (start, stop)} into cell_entries
+        self.large_segments = np.empty(0, dtype=np.int32) # Segments trop étendus pour la grille (bordures, cartouches...)
+        self.build()
+
+    @classmethod
+    def choose_cell_size(cls, segments):
+        """Choisit une taille de cellule adaptée à la densité de segments de la page."""
+        if not len(segments):
+            return cls.MAX_CELL_SIZE
+        xs = segments[:, 0::2]
+        ys = segments[:, 1::2]
+        area = max(float(xs.max() - xs.min()), 1.0) * max(float(ys.max() - ys.min()), 1.0)
+        # Environ quelques segments par cellule en moyenne
+        size = math.sqrt(area / len(segments)) * 2.0
+        return min(max(size, cls.MIN_CELL_SIZE), cls.MAX_CELL_SIZE)
+
+    def build(self):
+        """Construit la grille à partir du tableau de segments (entièrement vectorisé)."""
+        segs = self.segments
+        if not len(segs):
+            return
+        inv = 1.0 / self.cell_size
+        cx0 = np.floor(np.minimum(segs[:, 0], segs[:, 2]) * inv).astype(np.int64)
+        cx1 = np.floor(np.maximum(segs[:, 0], segs[:, 2]) * inv).astype(np.int64)
+        cy0 = np.floor(np.minimum(segs[:, 1], segs[:, 3]) * inv).astype(np.int64)
+        cy1 = np.floor(np.maximum(segs[:, 1], segs[:, 3]) * inv).astype(np.int64)
+        nx = cx1 - cx0 + 1
+        counts = nx * (cy1 - cy0 + 1)
+
+        is_large = counts > self.MAX_CELLS_PER_SEGMENT
+        self.large_segments = np.nonzero(is_large)[0].astype(np.int32)
+        small = np.nonzero(~is_large)[0]
+        if not len(small):
+            return
+
+        # Expand every segment into the list of cells covered by its bounding box
+        counts = counts[small]
+        seg_rep = np.repeat(small, counts)
+        local = np.arange(len(seg_rep)) - np.repeat(np.cumsum(counts) - counts, counts)
+        nx_rep = np.repeat(nx[small], counts)
+        cell_x = np.repeat(cx0[small], counts) + local % nx_rep
+        cell_y = np.repeat(cy0[small], counts) + local // nx_rep
+        keys = grid_cell_key(cell_x, cell_y)
+
+        order = np.argsort(keys, kind='stable')
+        self.cell_entries = seg_rep[order].astype(np.int32)
+        self.cell_keys, self.cell_starts, self.cell_counts = np.unique(keys[order], return_index=True, return_counts=True)
+        self.cell_slices = dict(zip(self.cell_keys.tolist(),
+                                    zip(self.cell_starts.tolist(), (self.cell_starts + self.cell_counts).tolist())))
+
+    def query(self, x, y, radius):
+        """Retourne les indices (tableau) des segments dont la boîte englobante peut être à moins de `radius` du point (x, y)."""
+        inv = 1.0 / self.cell_size
+        chunks = [self.large_segments]
+        cell_slices = self.cell_slices
+        entries = self.cell_entries
+        for cx in range(int(math.floor((x - radius) * inv)), int(math.floor((x + radius) * inv)) + 1):
+            for cy in range(int(math.floor((y - radius) * inv)), int(math.floor((y + radius) * inv)) + 1):
+                bounds = cell_slices.get(grid_cell_key(cx, cy))
+                if bounds:
+                    chunks.append(entries[bounds[0]:bounds[1]])
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.unique(np.concatenate(chunks))
+
+    def cells_along_segment(self, index):
+        """Retourne les clés des cellules traversées par un segment (et de leurs voisines)."""
+        x0, y0, x1, y1 = self.segments[index].tolist()
+        inv = 1.0 / self.cell_size
+        length = math.hypot(x1 - x0, y1 - y0)
+        steps = max(1, int(math.ceil(length * inv * 2))) # Pas d'une demi-cellule
+        t = np.linspace(0.0, 1.0, steps + 1)
+        cx = np.floor((x0 + t * (x1 - x0)) * inv).astype(np.int64)
+        cy = np.floor((y0 + t * (y1 - y0)) * inv).astype(np.int64)
+        offsets = np.array([-1, 0, 1], dtype=np.int64)
+        cx = (cx[:, None, None] + offsets[None, :, None]).repeat(3, axis=2).ravel()
+        cy = (cy[:, None, None] + offsets[None, None, :]).repeat(3, axis=1).ravel()
+        return set(np.unique(grid_cell_key(cx, cy)).tolist())
+
+    def entries_for_cells(self, keys):
+        """Retourne les indices des segments enregistrés dans un ensemble de cellules."""
+        chunks = [self.cell_entries[start:stop] for start, stop in
+                  (self.cell_slices[key] for key in keys if key in self.cell_slices)]
+        if not chunks:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(chunks))
+
+
+class PointGridIndex:
+    """Index spatial (grille uniforme) d'un ensemble de points (K, 2) en coordonnées PDF."""
+
+    def __init__(self, points, cell_size=SegmentGridIndex.MAX_CELL_SIZE / 4):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.cell_size = cell_size
+        self.cell_slices = {} # {cell_key: (start, stop)} into entries
+        self.entries = np.empty(0, dtype=np.int64)
+        if len(self.points):
+            cells = np.floor(self.points / cell_size).astype(np.int64)
+            keys = grid_cell_key(cells[:, 0], cells[:, 1])
+            self.entries = np.argsort(keys, kind='stable')
+            unique_keys, starts, counts = np.unique(keys[self.entries], return_index=True, return_counts=True)
+            self.cell_slices = dict(zip(unique_keys.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, x, y, radius):
+        """Retourne les indices (tableau) des points situés dans le carré de demi-côté `radius` autour de (x, y)."""
+        inv = 1.0 / self.cell_size
+        chunks = []
+        for cx in range(int(math.floor((x - radius) * inv)), int(math.floor((x + radius) * inv)) + 1):
+            for cy in range(int(math.floor((y - radius) * inv)), int(math.floor((y + radius) * inv)) + 1):
+                bounds = self.cell_slices.get(grid_cell_key(cx, cy))
+                if bounds:
+                    chunks.append(self.entries[bounds[0]:bounds[1]])
+        if not chunks:
+            return self.entries[:0]
+        return np.concatenate(chunks)
+
+
+def segment_intersections(seg_a, seg_b, eps=1e-9):
+    """Calcule les intersections de paires de segments (tableaux (P, 4)), de façon vectorisée.
+       Retourne (masque des paires qui se croisent, points (P, 2)). Les segments qui ne se touchent
+       que par leurs extrémités (coins de polylignes) et les segments parallèles sont ignorés."""
+    seg_a = np.asarray(seg_a, dtype=np.float64)
+    seg_b = np.asarray(seg_b, dtype=np.float64)
+    rx, ry = seg_a[:, 2] - seg_a[:, 0], seg_a[:, 3] - seg_a[:, 1]
+    sx, sy = seg_b[:, 2] - seg_b[:, 0], seg_b[:, 3] - seg_b[:, 1]
+    qx, qy = seg_b[:, 0] - seg_a[:, 0], seg_b[:, 1] - seg_a[:, 1]
+    denom = rx * sy - ry * sx
+    valid = np.abs(denom) >= eps # Parallel or collinear: no single crossing point
+    safe_denom = np.where(valid, denom, 1.0)
+    t = (qx * sy - qy * sx) / safe_denom
+    u = (qx * ry - qy * rx) / safe_denom
+    valid &= (t >= -eps) & (t <= 1 + eps) & (u >= -eps) & (u <= 1 + eps)
+    t_at_end = (t <= eps) | (t >= 1 - eps)
+    u_at_end = (u <= eps) | (u >= 1 - eps)
+    valid &= ~(t_at_end & u_at_end)
+    points = np.column_stack((seg_a[:, 0] + t * rx, seg_a[:, 1] + t * ry))
+    return valid, points
+
+
+def compute_segment_intersections(line_index, max_pairs_per_batch=1_000_000):
+    """Calcule les intersections segment-segment d'une page en parcourant la grille de `line_index`.
+
+    Seules les paires partageant une cellule sont testées (par lots vectorisés). Une intersection
+    n'est retenue que dans la cellule qui contient le point, ce qui évite les doublons entre
+    cellules voisines. Retourne un tableau (K, 2) de points PDF."""
+    segments = line_index.segments
+    inv = 1.0 / line_index.cell_size
+    found = []
+
+    multi = line_index.cell_counts >= 2
+    counts = line_index.cell_counts[multi]
+    starts = line_index.cell_starts[multi]
+    keys = line_index.cell_keys[multi]
+    entries = line_index.cell_entries
+
+    def test_rows(row_entry, row_partners, row_key):
+        # Each row pairs the entry at row_entry with the row_partners entries that follow it in its cell
+        pair_a = np.repeat(row_entry, row_partners)
+        pair_b = pair_a + 1 + (np.arange(len(pair_a)) - np.repeat(np.cumsum(row_partners) - row_partners, row_partners))
+        pair_key = np.repeat(row_key, row_partners)
+        valid, points = segment_intersections(segments[entries[pair_a]], segments[entries[pair_b]])
+        cells = np.floor(points[valid] * inv).astype(np.int64)
+        in_cell = grid_cell_key(cells[:, 0], cells[:, 1]) == pair_key[valid]
+        found.append(points[valid][in_cell])
+
+    # Split the cells into batches so that the number of candidate pairs stays bounded
+    pair_counts = counts * (counts - 1) // 2
+    fits = pair_counts <= max_pairs_per_batch
+    small = np.flatnonzero(fits)
+    batch_start = 0
+    while batch_start < len(small):
+        cumulative = np.cumsum(pair_counts[small[batch_start:]])
+        batch_end = batch_start + max(1, int(np.searchsorted(cumulative, max_pairs_per_batch, side='right')))
+        batch = small[batch_start:batch_end]
+        batch_start = batch_end
+        c, s, k = counts[batch], starts[batch], keys[batch]
+
+        # Every (i, j) with i < j inside each cell
+        first_counts = c - 1
+        a_cell = np.repeat(np.arange(len(c)), first_counts)
+        a_local = np.arange(len(a_cell)) - np.repeat(np.cumsum(first_counts) - first_counts, first_counts)
+        test_rows(s[a_cell] + a_local, c[a_cell] - 1 - a_local, k[a_cell])
+
+    # A dense cell alone above the limit is split into blocks of consecutive rows
+    for cell in np.flatnonzero(~fits).tolist():
+        c = int(counts[cell])
+        row_partners = c - 1 - np.arange(c - 1)
+        row = 0
+        while row < c - 1:
+            cumulative = np.cumsum(row_partners[row:])
+            row_end = row + max(1, int(np.searchsorted(cumulative, max_pairs_per_batch, side='right')))
+            test_rows(starts[cell] + np.arange(row, row_end), row_partners[row:row_end],
+                      np.full(row_end - row, keys[cell]))
+            row = row_end
+
+    # Large segments are not stored in the grid: walk the cells they cross instead
+    large = line_index.large_segments
+    for position, large_idx in enumerate(large.tolist()):
+        candidates = np.union1d(line_index.entries_for_cells(line_index.cells_along_segment(large_idx)),
+                                large[position + 1:])
+        if not len(candidates):
+            continue
+        seg_a = np.repeat(segments[large_idx:large_idx + 1], len(candidates), axis=0)
+        valid, points = segment_intersections(seg_a, segments[candidates])
+        found.append(points[valid])
+
+    if not found:
+        return np.empty((0, 2), dtype=np.float64)
+    all_points = np.concatenate(found)
+    if not len(all_points):
+        return all_points
+    return np.unique(np.round(all_points, 3), axis=0)
+
+
+def compute_page_intersections(page_lines, line_index=None):
+    """Intersections (K, 2) des segments d'une page. Appelée hors du thread Tk: dans le processus
+       d'extraction, ou dans le thread de géométrie pour une page extraite à la demande."""
+    if line_index is None:
+        line_index = SegmentGridIndex(page_lines)
+    return compute_segment_intersections(line_index)
+
+
+def measure_bbox(points):
+    """Boîte englobante (x0, y0, x1, y1) d'une liste de points PDF, ou None si la liste est vide."""
+    if not points:
+        return None
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def point_segment_distance(px, py, x0, y0, x1, y1):
+    """Distance du point (px, py) au segment (x0, y0)-(x1, y1)."""
+    dx, dy = x1 - x0, y1 - y0
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq <= 1e-12 else max(0.0, min(1.0, ((px - x0) * dx + (py - y0) * dy) / length_sq))
+    return math.hypot(px - (x0 + t * dx), py - (y0 + t * dy))
+
+
+def point_in_polygon(px, py, points):
+    """Test pair-impair: le point est-il à l'intérieur du polygone (liste de points)?"""
+    inside = False
+    j = len(points) - 1
+    for i in range(len(points)):
+        xi, yi = points[i][0], points[i][1]
+        xj, yj = points[j][0], points[j][1]
+        if (yi > py) != (yj > py) and px < (xj - xi) * (py - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def measure_hit_distance(px, py, measure_type, points):
+    """Distance (PDF) du point à la géométrie d'une mesure: segments de la polyligne (fermée pour
+       les surfaces et périmètres), côtés d'un angle, ou sommets pour une géométrie dégénérée."""
+    if not points:
+        return math.inf
+    if len(points) == 1:
+        return math.hypot(px - points[0][0], py - points[0][1])
+    path = list(points)
+    if measure_type in ("surface", "perimeter") and len(points) > 2:
+        path.append(points[0])
+    return min(point_segment_distance(px, py, a[0], a[1], b[0], b[1]) for a, b in zip(path, path[1:]))
+
+
+class BoxGridIndex:
+    """Index spatial incrémental (grille uniforme de cellules dans un dictionnaire) de boîtes
+       englobantes identifiées, en coordonnées PDF. Les insertions et suppressions sont unitaires,
+       pour suivre l'ajout et la suppression de mesures sans reconstruire l'index."""
+
+    MAX_CELLS_PER_BOX = 256 # Au-delà, la boîte est gardée dans la liste des "grandes" boîtes
+
+    def __init__(self, cell_size=64.0):
+        self.cell_size = cell_size
+        self.cells = {} # {cell_key: set(item_id)}
+        self.boxes = {} # {item_id: (x0, y0, x1, y1)}
+        self.payloads = {} # {item_id: object stored with the box (e.g. the measure)}
+        self.large_items = set()
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, item_id):
+        return item_id in self.boxes
+
+    def cell_range(self, x0, y0, x1, y1):
+        inv = 1.0 / self.cell_size
+        return (int(math.floor(x0 * inv)), int(math.floor(y0 * inv)),
+                int(math.floor(x1 * inv)), int(math.floor(y1 * inv)))
+
+    def get(self, item_id):
+        return self.payloads.get(item_id)
+
+    def insert(self, item_id, box, payload=None):
+        if item_id in self.boxes:
+            self.remove(item_id)
+        if box is None:
+            return
+        self.boxes[item_id] = box
+        self.payloads[item_id] = payload
+        cx0, cy0, cx1, cy1 = self.cell_range(*box)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.MAX_CELLS_PER_BOX:
+            self.large_items.add(item_id)
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault(grid_cell_key(cx, cy), set()).add(item_id)
+
+    def remove(self, item_id):
+        box = self.boxes.pop(item_id, None)
+        if box is None:
+            return
+        self.payloads.pop(item_id, None)
+        if item_id in self.large_items:
+            self.large_items.discard(item_id)
+            return
+        cx0, cy0, cx1, cy1 = self.cell_range(*box)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                key = grid_cell_key(cx, cy)
+                cell = self.cells.get(key)
+                if cell is not None:
+                    cell.discard(item_id)
+                    if not cell:
+                        del self.cells[key]
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Retourne l'ensemble des identifiants dont la boîte intersecte le rectangle."""
+        candidates = set(self.large_items)
+        cx0, cy0, cx1, cy1 = self.cell_range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Large query area: walking the occupied cells is cheaper than the rectangle
+            for cell in self.cells.values():
+                candidates.update(cell)
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    cell = self.cells.get(grid_cell_key(cx, cy))
+                    if cell:
+                        candidates.update(cell)
+        boxes = self.boxes
+        return {item_id for item_id in candidates
+                if boxes[item_id][0] <= x1 and boxes[item_id][2] >= x0 and boxes[item_id][1] <= y1 and boxes[item_id][3] >= y0}
+
+
+# --- Stockage des mesures ---
+
+class MeasureRecord:
+    """Mesure du MeasureStore: champs connus en __slots__ (pas de dictionnaire par mesure), avec
+       l'interface d'un dict (get, [], in) utilisée par le reste de l'application et les exports.
+       Les points sont gardés en tuple de tuples (x, y); les clés inconnues vont dans `extra`."""
+
+    FIELDS = ("id", "type", "value", "points", "page", "display_text", "unit_at_creation", "color",
+              "product_category", "product_name", "product_attributes")
+    FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, data):
+        self.extra = None
+        for key, value in data.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self.FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError: # Field never set (older project files)
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "points" and value is not None:
+            value = tuple((p[0], p[1]) for p in value)
+        if key in self.FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """Copie en dictionnaire (sauvegarde JSON du projet)."""
+        data = {key: getattr(self, key) for key in self.FIELDS if hasattr(self, key)}
+        if self.extra:
+            data.update(self.extra)
+        if data.get("points") is not None:
+            data["points"] = [list(p) for p in data["points"]]
+        return data
+
+
+class MeasureStore:
+    """Stockage indexé des mesures: accès O(1) par identifiant et index secondaires par page et par
+       produit (dictionnaires {id: mesure}, donc suppression en O(1) et ordre d'insertion conservé).
+       Les identifiants sont des entiers croissants donnés par allocate_id() (jamais réutilisés).
+       Les champs indexés (id, page, product_name) sont fixés avant add(): une mesure modifiée est retirée
+       puis rajoutée."""
+
+    def __init__(self, measures=()):
+        self.next_id = 1
+        self.by_id = {}
+        self.by_page = {} # {page_index: {measure_id: record}}
+        self.by_product = {} # {product_name: {measure_id: record}}, mesures associées à un produit seulement
+        self.replace(measures)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(list(self.by_id.values())) # Snapshot: the store can change while iterating
+
+    def __contains__(self, measure_id):
+        return measure_id in self.by_id
+
+    def get(self, measure_id, default=None):
+        return self.by_id.get(measure_id, default)
+
+    def allocate_id(self):
+        """Retourne un nouvel identifiant de mesure (compteur entier monotone, sans collision possible)."""
+        measure_id = self.next_id
+        self.next_id += 1
+        return measure_id
+
+    @staticmethod
+    def migrate_ids(measures):
+        """Renumérote 1..N, dans l'ordre, les mesures d'un ancien projet dont les identifiants ne sont pas
+           des entiers distincts (horodatages time.time(), éventuellement en double).
+           Modifie les dictionnaires en place; retourne le nombre de mesures renumérotées."""
+        ids = [measure.get("id") for measure in measures]
+        if all(type(measure_id) is int for measure_id in ids) and len(set(ids)) == len(ids):
+            return 0
+        for new_id, measure in enumerate(measures, 1):
+            measure["id"] = new_id
+        return len(measures)
+
+    def add(self, measure):
+        """Ajoute une mesure (dict ou MeasureRecord); retourne l'enregistrement stocké."""
+        record = measure if isinstance(measure, MeasureRecord) else MeasureRecord(measure)
+        measure_id = record.get("id")
+        if measure_id in self.by_id:
+            raise ValueError(f"Identifiant de mesure déjà utilisé: {measure_id}")
+        self.by_id[measure_id] = record
+        self._index(record)
+        if type(measure_id) is int and measure_id >= self.next_id:
+            self.next_id = measure_id + 1
+        return record
+
+    def remove(self, measure_id):
+        """Retire une mesure; retourne l'enregistrement retiré, ou None s'il n'existe pas."""
+        record = self.by_id.pop(measure_id, None)
+        if record is not None:
+            self._unindex(record)
+        return record
+
+    def clear(self):
+        self.by_id = {}
+        self.by_page = {}
+        self.by_product = {}
+
+    def replace(self, measures):
+        """Remplace toutes les mesures (chargement d'un projet); le compteur d'identifiants repart après le plus grand."""
+        self.clear()
+        self.next_id = 1
+        for measure in measures:
+            self.add(measure)
+
+    def on_page(self, page_index):
+        """Mesures d'une page (vue sur l'index, dans l'ordre d'insertion)."""
+        return self.by_page.get(page_index, {}).values()
+
+    def with_product(self, product_name=None):
+        """Mesures associées à un produit donné, ou à n'importe quel produit (product_name=None)."""
+        if product_name is not None:
+            return list(self.by_product.get(product_name, {}).values())
+        return [record for records in self.by_product.values() for record in records.values()]
+
+    def product_names(self):
+        return list(self.by_product)
+
+    def to_dicts(self):
+        """Liste de dictionnaires des mesures (sauvegarde du projet)."""
+        return [record.to_dict() for record in self.by_id.values()]
+
+    def _index(self, record):
+        measure_id = record.get("id")
+        self.by_page.setdefault(record.get("page"), {})[measure_id] = record
+        product_name = record.get("product_name")
+        if product_name:
+            self.by_product.setdefault(product_name, {})[measure_id] = record
+
+    def _unindex(self, record):
+        measure_id = record.get("id")
+        for index, key in ((self.by_page, record.get("page")), (self.by_product, record.get("product_name"))):
+            records = index.get(key)
+            if records is not None:
+                records.pop(measure_id, None)
+                if not records:
+                    del index[key]
+
+
+class CommandJournal:
+    """Journal d'annulation/rétablissement des modifications de mesures.
+       Chaque entrée est un delta compact: ("add", mesures), ("delete", mesures) ou ("scale", ancienne, nouvelle);
+       les mesures sont les MeasureRecord eux-mêmes (aucune copie), réinsérés tels quels.
+       La taille est bornée en nombre d'entrées et en nombre de mesures retenues (les plus anciennes sont oubliées)."""
+
+    def __init__(self, max_entries=200, max_records=50000):
+        self.max_entries = max_entries
+        self.max_records = max_records
+        self.undo_stack = deque()
+        self.redo_stack = deque()
+        self.record_count = 0 # Measures referenced by the entries of both stacks
+
+    @staticmethod
+    def entry_size(entry):
+        return len(entry[1]) if entry[0] in ("add", "delete") else 1
+
+    def record(self, kind, *data):
+        """Enregistre une nouvelle modification (le rétablissement des entrées annulées n'est plus possible)."""
+        self.record_count -= sum(self.entry_size(entry) for entry in self.redo_stack)
+        self.redo_stack.clear()
+        entry = (kind,) + tuple(data)
+        self.undo_stack.append(entry)
+        self.record_count += self.entry_size(entry)
+        self.enforce_limits()
+
+    def enforce_limits(self):
+        # The newest entry is always kept, even alone above the cap, so that the last action can be undone
+        while len(self.undo_stack) > 1 and (len(self.undo_stack) > self.max_entries or self.record_count > self.max_records):
+            self.record_count -= self.entry_size(self.undo_stack.popleft())
+
+    def undo(self):
+        """Retourne la dernière entrée à annuler (déplacée vers la pile de rétablissement), ou None."""
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry
+
+    def redo(self):
+        """Retourne la dernière entrée annulée à rétablir (remise sur la pile d'annulation), ou None."""
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.record_count = 0
+
+    def compact(self):
+        """Compacte la pile d'annulation (à l'enregistrement du projet): les calibrations successives sont
+           fusionnées, et un ajout immédiatement suivi de la suppression des mêmes mesures disparaît."""
+        compacted = []
+        for entry in self.undo_stack:
+            previous = compacted[-1] if compacted else None
+            if previous is not None and entry[0] == "scale" and previous[0] == "scale":
+                compacted[-1] = ("scale", previous[1], entry[2])
+                if previous[1] == entry[2]: # Back to the starting scale: nothing left to undo
+                    compacted.pop()
+                continue
+            if (previous is not None and entry[0] == "delete" and previous[0] == "add"
+                    and {id(record) for record in entry[1]} == {id(record) for record in previous[1]}):
+                compacted.pop()
+                continue
+            compacted.append(entry)
+        self.undo_stack = deque(compacted)
+        self.record_count = sum(self.entry_size(entry) for entry in self.undo_stack) + \
+                            sum(self.entry_size(entry) for entry in self.redo_stack)
+
+
+# --- Rendu de page par tuiles ---
+
+TILE_SIZE = 512 # Tile edge in display pixels
+
+
+def tile_zoom_key(display_resolution_factor):
+    """Clé de niveau de zoom des tuiles (arrondie pour rester stable malgré les flottants)."""
+    return round(display_resolution_factor, 4)
+
+
+def render_page_tile(page, display_resolution_factor, tile_x, tile_y, tile_size=TILE_SIZE):
+    """Rend une tuile de la page (get_pixmap limité par clip) et retourne une image PIL RGB, ou None
+       si la tuile est hors de la page. Les tuiles sont alignées sur la grille des pixels d'affichage."""
+    page_rect = page.rect
+    clip = fitz.Rect(page_rect.x0 + tile_x * tile_size / display_resolution_factor,
+                     page_rect.y0 + tile_y * tile_size / display_resolution_factor,
+                     page_rect.x0 + (tile_x + 1) * tile_size / display_resolution_factor,
+                     page_rect.y0 + (tile_y + 1) * tile_size / display_resolution_factor) & page_rect
+    if clip.is_empty:
+        return None
+    mat = fitz.Matrix(display_resolution_factor, display_resolution_factor)
+    pix = page.get_pixmap(matrix=mat, clip=clip, alpha=False) # alpha=False for opaque RGB
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+
+DETECTED_LINE_RGBA = (0, 120, 215, 150) # Semi-transparent blue of the detected-lines layer
+
+
+def render_lines_tile(line_index, display_resolution_factor, tile_x, tile_y, tile_size=TILE_SIZE,
+                      color=DETECTED_LINE_RGBA):
+    """Dessine (PIL ImageDraw) les segments d'une page qui traversent une tuile, sur une image RGBA
+       transparente alignée sur la grille des tuiles de la page. Retourne None si la tuile est vide."""
+    inv = 1.0 / display_resolution_factor
+    x0, y0 = tile_x * tile_size * inv, tile_y * tile_size * inv
+    x1, y1 = x0 + tile_size * inv, y0 + tile_size * inv
+    half = (x1 - x0) / 2
+    candidates = line_index.query(x0 + half, y0 + half, half * 1.5)
+    if not len(candidates):
+        return None
+    segs = line_index.segments[candidates]
+    crossing = ((np.minimum(segs[:, 0], segs[:, 2]) <= x1) & (np.maximum(segs[:, 0], segs[:, 2]) >= x0) &
+                (np.minimum(segs[:, 1], segs[:, 3]) <= y1) & (np.maximum(segs[:, 1], segs[:, 3]) >= y0))
+    segs = segs[crossing]
+    if not len(segs):
+        return None
+
+    # Tile-local pixel coordinates for all the segments at once
+    local = segs.astype(np.float64) * display_resolution_factor
+    local[:, 0::2] -= tile_x * tile_size
+    local[:, 1::2] -= tile_y * tile_size
+    img = Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for coords in local.tolist():
+        draw.line(coords, fill=color, width=1)
+    return img
+
+
+PAGE_PREVIEW_MAX_SIZE = 1024 # Longest edge of the low-resolution page preview, in pixels
+
+_render_worker_documents = {} # Document opened by a render worker process {pdf_path: fitz.Document}
+
+
+def render_image_worker(pdf_path, page_index, display_resolution_factor, tile=None):
+    """Rend une tuile (tile=(tile_x, tile_y)) ou la page entière (tile=None) dans un processus de rendu.
+       Le document reste ouvert dans le processus entre deux appels; retourne (largeur, hauteur, octets RGB) ou None."""
+    document = _render_worker_documents.get(pdf_path)
+    if document is None:
+        for old_document in _render_worker_documents.values():
+            old_document.close()
+        _render_worker_documents.clear()
+        document = fitz.open(pdf_path)
+        _render_worker_documents[pdf_path] = document
+
+    page = document[page_index]
+    if tile is None:
+        mat = fitz.Matrix(display_resolution_factor, display_resolution_factor)
+        pix = page.get_pixmap(matrix=mat, alpha=False)
+        return pix.width, pix.height, pix.samples
+    img = render_page_tile(page, display_resolution_factor, tile[0], tile[1])
+    if img is None:
+        return None
+    return img.width, img.height, img.tobytes()
+
+
+class TextExtentCache:
+    """Cache des dimensions (largeur, hauteur) en pixels des textes pour une police donnée.
+       Utilise tkfont.Font.measure et les métriques de la police: aucun élément temporaire
+       sur le canvas n'est nécessaire pour placer le fond d'une étiquette."""
+
+    MAX_ENTRIES = 20000
+
+    def __init__(self, font_spec):
+        self.font = tkfont.Font(font=font_spec)
+        self.linespace = self.font.metrics("linespace")
+        self.extents = {}
+
+    def measure(self, text):
+        extent = self.extents.get(text)
+        if extent is None:
+            lines = text.split("\n")
+            extent = (max(self.font.measure(line) for line in lines), self.linespace * len(lines))
+            if len(self.extents) >= self.MAX_ENTRIES:
+                self.extents.clear()
+            self.extents[text] = extent
+        return extent
+
+
+class TileCache:
+    """Cache LRU des tuiles rendues, clé (page, zoom_level, tile_x, tile_y), borné en mémoire.
+       Les valeurs sont des PhotoImage prêtes à afficher, avec l'image PIL source si fournie (pour la
+       rééchantillonner pendant un zoom rapide); la taille est estimée à 4 octets par pixel et par copie."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict() # key -> (photo, size_bytes, image), least recently used first
+
+    def get(self, key):
+        """Retourne la valeur en cache (la marque comme récemment utilisée), ou None si absente."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def touch(self, keys):
+        """Marque les clés encore affichées comme récemment utilisées, pour qu'elles ne soient pas évincées
+           (leur PhotoImage disparaîtrait du canvas)."""
+        for key in keys:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+
+    def get_image(self, key):
+        """Retourne l'image PIL source d'une tuile en cache, ou None (absente ou non conservée)."""
+        entry = self.entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def put(self, key, photo, width, height, image=None):
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        size_bytes = width * height * 4 * (2 if image is not None else 1)
+        self.entries[key] = (photo, size_bytes, image)
+        self.total_bytes += size_bytes
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_bytes, _) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+
+    def discard_page(self, page_index):
+        """Retire les tuiles d'une seule page (toutes résolutions)."""
+        for key in [key for key in self.entries if key[0] == page_index]:
+            self.total_bytes -= self.entries.pop(key)[1]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+
 class MetrePDFApp:
+    LINE_MIN_LENGTH_PTS = 3 # Ignore detected lines shorter than ~1mm (noise)
+    MAX_PAGE_PREVIEWS = 16 # Low-resolution page previews kept in memory
+    ZOOM_REFINE_DELAY_MS = 250 # Quiet time after the last zoom step before re-rendering at the new resolution
+    OVERLAY_VIEW_MARGIN = 0.5 # Overlay items are materialized up to half a viewport beyond each edge
+    OVERLAY_LABEL_MARGIN_PX = 80 # Labels and angle arcs may extend this far outside a measure's points
+    HOVER_TOLERANCE_PX = 6 # Distance to a measure's geometry for hover / Ctrl+click selection
+    MOTION_FRAME_MS = 16 # Pointer feedback (snap, rubber band, status) is processed at most once per ~60 Hz frame
+    SNAP_CACHE_SIZE = 256 # Memoized snap results (hover and click at the same pixel share one lookup)
+    MEASURE_LIST_BUFFER_ROWS = 5 # Rows materialized below the visible ones in the measures list
+    MEASURE_LIST_HEADINGS = {"type": "Type", "valeur": "Valeur", "produit": "Produit", "page": "Page"}
+
     def __init__(self, root):
         self.root = root
         self.root.title("Constructo AI - TakeOff")
@@ -1173,9 +2335,52 @@ class MetrePDFApp:
         self.zoom_factor = 1.0
         self.absolute_scale = None # Scale at zoom=1.0 (METERS per PDF point unit), constant after calibration
         self.points = [] # Temporary points for ongoing measurement (STORE PDF COORDS)
-        self.measures = []  # Storage of completed measurements {id, type, value (pdf_pts/pdf_pts^2/deg), points (pdf), page, display_text, product_info...}
+        self.measures = MeasureStore()  # Completed measurements {id, type, value (pdf_pts/pdf_pts^2/deg), points (pdf), page, display_text, product_info...}, indexed by id, page and product
         self.mode = "distance"  # Modes: "distance", "surface", "perimeter", "angle", "calibration"
-        self.lines_by_page = {}  # Storage of detected lines for snapping {page_index: [((x0_pdf,y0_pdf),(x1_pdf,y1_pdf)), ...]}
+        self.lines_by_page = {}  # Cache of detected lines for snapping, filled lazily {page_index: float32 array (N, 4) of x0_pdf, y0_pdf, x1_pdf, y1_pdf}
+        self.line_index_by_page = {} # Spatial index of detected lines {page_index: SegmentGridIndex}
+        self.intersections_by_page = {} # Line crossings {page_index: PointGridIndex}, or (K, 2) array until first use
+        self.curves_by_page = {} # Curve snap points {page_index: {"start", "points", "kinds", "index"}}
+        self._line_extraction_job = None # 'after' id of the background extraction of pending pages
+        self.snap_cache = OrderedDict() # Memoized find_closest_line_point results, see snap_cache_key
+        self.measure_list_order = [] # Ids shown in the measures list (filtered and sorted), only a window is materialized
+        self.measure_list_first = 0 # Index in measure_list_order of the first materialized row
+        self.measure_list_positions = {} # {measure_id: index in measure_list_order}; None when stale, rebuilt on next lookup
+        self.measure_list_selection = set() # Selected measure ids, including rows scrolled out of the Treeview
+        self.measure_list_sort = (None, False) # (column, descending); None = creation order
+        self.journal = CommandJournal() # Undo/redo of measure additions, deletions and calibrations
+        self.line_extraction_executor = None # ProcessPoolExecutor extracting pending pages
+        self.line_extraction_futures = []
+        self.line_extraction_total = 0 # Pages submitted / received, for the progress bar
+        self.line_extraction_done = 0
+        self.geometry_cache = None # GeometryCache of the open PDF (segments persisted on disk)
+        self.geometry_executor = None # Thread hashing the PDF for the disk cache and computing intersections of pages extracted on demand
+        self.geometry_futures = {} # Geometry jobs in flight {("cache", pdf_path) or ("intersections", page_index): future}
+        self._geometry_poll_job = None
+        self.tile_cache = TileCache() # Rendered page tiles (LRU, bounded memory)
+        self.tile_items = {} # Tiles currently on the canvas {(tile_x, tile_y): canvas item id}
+        self.line_tile_cache = TileCache(max_bytes=64 * 1024 * 1024) # Detected-lines layer tiles (RGBA)
+        self.line_tile_items = {} # Detected-lines tiles on the canvas {(tile_x, tile_y): canvas item id}
+        self._tile_update_job = None
+        self.render_executor = None # ProcessPoolExecutor rasterizing tiles and previews off the Tk thread
+        self.render_futures = {} # Renders in flight {key: future}, key = tile key or ("preview", page)
+        self._render_poll_job = None
+        self.page_previews = OrderedDict() # Low-resolution page images {page_index: PIL Image}, LRU
+        self._preview_photoimage = None
+        self._zoom_refine_job = None # Pending full redraw after a fast (scaled) zoom
+        self.zoom_snapshot = None # Tiles on screen when the fast zoom started, resampled until the refine
+        self._zoom_snapshot_photoimage = None
+        self.measure_items = {} # Retained overlay of the current page {measure_id: {role: [canvas item ids]}}
+        self.label_font = ("Arial", 9, "bold")
+        self.label_extents = TextExtentCache(self.label_font) # Label sizes, so the background is drawn without a temporary text
+        self.measure_index_by_page = {} # Bounding boxes of the measures {page_index: BoxGridIndex}, built lazily
+        self.overlay_rect = None # PDF area (x0, y0, x1, y1) whose overlay items are currently on the canvas
+        self._overlay_update_job = None
+        self._pending_motion = None # Latest pointer position (screen coords) waiting for the next motion frame
+        self._motion_job = None
+        self.motion_items = {} # Reused snap indicator / rubber-band items {name: canvas item id}
+        self.hovered_measure_id = None # Measure under the cursor (hover highlight, Ctrl+click selection)
+        self.motion_item_options = {} # Last options applied to each motion item, to skip redundant itemconfig
         self.ortho_mode = False  # State of orthogonal mode (Shift key)
         self.panning = False
         self.pan_start_x = 0
@@ -1322,8 +2527,10 @@ class MetrePDFApp:
         self.create_ai_panel()
 
         # Barre de statut
+        self.status_frame = ttk.Frame(self.root) # Attach to root so it's always at the bottom
+        self.status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_bar = ttk.Label(
-            self.root, # Attach to root so it's always at the bottom
+            self.status_frame,
             text="Prêt",
             relief=tk.SUNKEN,
             anchor=tk.W,
@@ -1331,7 +2538,17 @@ class MetrePDFApp:
             background="#e0e0e0",
             foreground=self.colors["text_dark"]
         )
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # Progression de l'extraction des lignes en arrière-plan (affichée seulement pendant l'extraction)
+        self.extraction_progress_frame = ttk.Frame(self.status_frame)
+        self.extraction_progress_label = ttk.Label(self.extraction_progress_frame, text="Lignes: 0/0", width=16, anchor='e')
+        self.extraction_progress_label.pack(side=tk.LEFT, padx=(5, 2))
+        self.extraction_progress = ttk.Progressbar(self.extraction_progress_frame, orient=tk.HORIZONTAL,
+                                                   length=150, mode='determinate')
+        self.extraction_progress.pack(side=tk.LEFT, padx=2)
+        ttk.Button(self.extraction_progress_frame, text="Annuler", width=8,
+                   command=self.cancel_line_extraction).pack(side=tk.LEFT, padx=(2, 5))
 
     def create_toolbar(self):
         """Crée la barre d'outils"""
@@ -1436,7 +2653,8 @@ class MetrePDFApp:
 
         self.h_scrollbar = ttk.Scrollbar(self.pdf_frame_container, orient=tk.HORIZONTAL, command=self.canvas.xview)
         self.v_scrollbar = ttk.Scrollbar(self.pdf_frame_container, orient=tk.VERTICAL, command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=self.h_scrollbar.set, yscrollcommand=self.v_scrollbar.set)
+        # The scroll commands are called on every view change (scroll, pan, resize, zoom): visible tiles follow
+        self.canvas.configure(xscrollcommand=self.on_canvas_xscroll, yscrollcommand=self.on_canvas_yscroll)
 
         # Layout scrollbars and canvas using grid for better control
         self.pdf_frame_container.grid_rowconfigure(0, weight=1)
@@ -1449,6 +2667,7 @@ class MetrePDFApp:
 
         # Gestionnaires d'événements pour le canvas
         self.canvas.bind("<Button-1>", self.on_canvas_click) # Left click
+        self.canvas.bind("<Control-Button-1>", self.on_canvas_ctrl_click) # Select the measure under the cursor
         self.canvas.bind("<Motion>", self.on_canvas_move)
         self.canvas.bind("<Double-Button-1>", self.on_canvas_double_click) # Double click
         self.canvas.bind("<MouseWheel>", self.on_mousewheel)  # For Windows/macOS Trackpad
@@ -1476,27 +2695,50 @@ class MetrePDFApp:
         self.measures_frame = ttk.LabelFrame(self.measures_tab, text="Liste des mesures", style="TLabelframe")
         self.measures_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=(5,0)) # No bottom padding
 
-        # Configure Treeview here
+        # Filters (applied on the measure store indexes, not on the Treeview rows)
+        filter_frame = ttk.Frame(self.measures_frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 3))
+        ttk.Label(filter_frame, text="Page:").pack(side=tk.LEFT)
+        self.measure_page_filter = tk.StringVar(value="Toutes")
+        self.measure_page_filter_combo = ttk.Combobox(filter_frame, textvariable=self.measure_page_filter,
+                                                      values=["Toutes"], width=7, state="readonly")
+        self.measure_page_filter_combo.pack(side=tk.LEFT, padx=(2, 8))
+        ttk.Label(filter_frame, text="Produit:").pack(side=tk.LEFT)
+        self.measure_product_filter = tk.StringVar(value="Tous")
+        self.measure_product_filter_combo = ttk.Combobox(filter_frame, textvariable=self.measure_product_filter,
+                                                         values=["Tous", "(aucun)"], width=18, state="readonly")
+        self.measure_product_filter_combo.pack(side=tk.LEFT, padx=2, fill=tk.X, expand=True)
+        self.measure_page_filter_combo.bind("<<ComboboxSelected>>", lambda e: self.rebuild_measure_list_order())
+        self.measure_product_filter_combo.bind("<<ComboboxSelected>>", lambda e: self.rebuild_measure_list_order())
+
+        # Configure Treeview here (virtualized: only the visible rows are materialized, see render_measure_list_rows)
         self.measures_list = ttk.Treeview(
             self.measures_frame,
             # Columns defined later in update_measures_treeview_columns
             show="headings",
             style="Treeview"
         )
-        # Add scrollbar to treeview
-        measure_vsb = ttk.Scrollbar(self.measures_frame, orient="vertical", command=self.measures_list.yview)
+        # The vertical scrollbar covers the whole (filtered) list, not the materialized rows
+        self.measure_list_vsb = ttk.Scrollbar(self.measures_frame, orient="vertical", command=self.on_measure_list_scroll)
         measure_hsb = ttk.Scrollbar(self.measures_frame, orient="horizontal", command=self.measures_list.xview)
-        self.measures_list.configure(yscrollcommand=measure_vsb.set, xscrollcommand=measure_hsb.set)
+        self.measures_list.configure(xscrollcommand=measure_hsb.set)
 
-        self.measures_list.grid(row=0, column=0, sticky='nsew')
-        measure_vsb.grid(row=0, column=1, sticky='ns')
-        measure_hsb.grid(row=1, column=0, sticky='ew')
+        self.measures_list.grid(row=1, column=0, sticky='nsew')
+        self.measure_list_vsb.grid(row=1, column=1, sticky='ns')
+        measure_hsb.grid(row=2, column=0, sticky='ew')
 
-        self.measures_frame.grid_rowconfigure(0, weight=1)
+        self.measures_frame.grid_rowconfigure(1, weight=1)
         self.measures_frame.grid_columnconfigure(0, weight=1)
 
         # --- AJOUT : Lier l'événement de sélection ---
         self.measures_list.bind('<<TreeviewSelect>>', self.on_measure_select)
+        self.measures_list.bind('<Button-1>', self.on_measure_list_click, add="+")
+        self.measures_list.bind('<Configure>', lambda e: self.render_measure_list_rows())
+        self.measures_list.bind('<MouseWheel>', self.on_measure_list_wheel)
+        self.measures_list.bind('<Button-4>', lambda e: self.on_measure_list_wheel(e, 1))
+        self.measures_list.bind('<Button-5>', lambda e: self.on_measure_list_wheel(e, -1))
+        self.measures_list.bind('<Up>', lambda e: self.move_measure_list_selection(-1, e))
+        self.measures_list.bind('<Down>', lambda e: self.move_measure_list_selection(1, e))
 
         # Boutons d'actions pour les mesures
         self.measures_buttons_frame = ttk.Frame(self.measures_tab) # Use ttk Frame
@@ -1623,10 +2865,10 @@ class MetrePDFApp:
          """Sets or updates the columns for the measures Treeview."""
          self.measures_list["columns"] = ("type", "valeur", "produit", "page")
          self.measures_list.heading("#0", text="", anchor='w') # Hide the first default column
-         self.measures_list.heading("type", text="Type", anchor='w')
-         self.measures_list.heading("valeur", text="Valeur", anchor='w')
-         self.measures_list.heading("produit", text="Produit", anchor='w')
-         self.measures_list.heading("page", text="Page", anchor='center')
+         # Clicking a heading sorts the list on the store (see sort_measure_list)
+         for column, anchor in (("type", 'w'), ("valeur", 'w'), ("produit", 'w'), ("page", 'center')):
+              self.measures_list.heading(column, text=self.MEASURE_LIST_HEADINGS[column], anchor=anchor,
+                                         command=lambda c=column: self.sort_measure_list(c))
 
          # Adjust column widths
          self.measures_list.column("#0", width=0, stretch=tk.NO)
@@ -1681,6 +2923,14 @@ class MetrePDFApp:
         ttk.Checkbutton(snap_types_frame, text="Intersections",
                        variable=self.snap_to_intersections).pack(side=tk.LEFT, padx=5, pady=2)
 
+        self.snap_to_arcs = tk.BooleanVar(value=True)
+        ttk.Checkbutton(snap_types_frame, text="Arcs",
+                       variable=self.snap_to_arcs).pack(side=tk.LEFT, padx=5, pady=2)
+
+        self.snap_to_measures = tk.BooleanVar(value=True)
+        ttk.Checkbutton(snap_types_frame, text="Mesures",
+                       variable=self.snap_to_measures).pack(side=tk.LEFT, padx=5, pady=2)
+
 
         # Ortho Mode Info
         ortho_frame = ttk.LabelFrame(parent_frame, text="Mode Ortho", style="TLabelframe")
@@ -2766,7 +4016,7 @@ class MetrePDFApp:
             }
 
         # Get response from AI
-        ai_response = self.ai_assistant.get_response(user_message, self.measures, pdf_info_context)
+        ai_response = self.ai_assistant.get_response(user_message, list(self.measures), pdf_info_context)
 
         # Display AI response (or error message)
         # Check if the response indicates an error from the AI class itself
@@ -2846,8 +4096,10 @@ class MetrePDFApp:
             if self.pdf_document:
                 self.pdf_document.close()
                 self.canvas.delete("all") # Clear canvas
-                self.measures = [] # Clear measures
-                self.lines_by_page = {} # Clear detected lines
+                self.measures.clear() # Clear measures
+                self.journal.clear()
+                self.reset_measure_index()
+                self.reset_line_cache() # Clear detected lines
                 self.absolute_scale = None
                 self.update_measures_list() # Clear treeview
                 self.scale_info.config(text="Non définie")
@@ -2862,11 +4114,16 @@ class MetrePDFApp:
             self.zoom_factor = 1.0 # Reset zoom
             self.zoom_level.config(text="100%")
 
-            # Perform initial setup for the new document
-            self.status_bar.config(text="Extraction des lignes...")
-            self.root.update_idletasks()
-            self.extract_lines_from_pdf() # Extract lines for snapping
-
+            # Lines for snapping are extracted lazily: the current page first (see display_page),
+            # then the other pages in the background, so the first page shows up immediately.
+            # Pages already extracted in a previous session are read back from the disk cache.
+            self.reset_line_cache()
+            self.tile_cache.clear()
+            self.page_previews.clear()
+            for future in self.render_futures.values():
+                future.cancel()
+            self.render_futures = {}
+            self.load_cached_page_lines() # Hashed in the background: the first page is not delayed by large files
             self.display_page() # Display the first page
             self.update_document_info() # Update side panel info
             self.status_bar.config(text=f"Document ouvert: {os.path.basename(file_path)}")
@@ -2884,8 +4141,9 @@ class MetrePDFApp:
             messagebox.showerror("Erreur d'Ouverture", f"Impossible d'ouvrir le fichier PDF '{os.path.basename(file_path)}':\n{str(e)}", parent=self.root)
             self.pdf_document = None
             self.pdf_path = None
-            self.measures = []
-            self.lines_by_page = {}
+            self.measures.clear()
+            self.reset_measure_index()
+            self.reset_line_cache()
             self.absolute_scale = None
             self.selected_measure_id = None
             self.canvas.delete("all")
@@ -2896,95 +4154,270 @@ class MetrePDFApp:
             self.status_bar.config(text="Erreur d'ouverture. Prêt.")
             self.root.title("TakeOff AI")
 
-    def extract_lines_from_pdf(self):
-        """Extrait les lignes et segments du document PDF actuel pour snapping."""
-        if not self.pdf_document:
+    def reset_line_cache(self):
+        """Vide le cache des lignes détectées (et les index dérivés) et annule l'extraction en arrière-plan."""
+        self.cancel_line_extraction(update_status=False)
+        self.lines_by_page = {}
+        self.line_index_by_page = {}
+        self.intersections_by_page = {}
+        self.curves_by_page = {}
+        self.line_tile_cache.clear() # Detected-lines layer of every page, rendered from the lines dropped here
+        for key in [key for key in self.geometry_futures if key[0] == "intersections"]:
+            self.geometry_futures.pop(key).cancel() # A job already running finishes, its result is dropped
+        self.invalidate_snap_cache()
+
+    def load_cached_page_lines(self):
+        """Ouvre en arrière-plan le cache disque des segments de ce PDF (le hash du contenu n'est pas calculé
+           sur le thread Tk); à l'arrivée, apply_geometry_cache charge les pages en cache et lance l'extraction des autres."""
+        self.geometry_cache = None
+        for key in [key for key in self.geometry_futures if key[0] == "cache"]:
+            self.geometry_futures.pop(key).cancel()
+        if not self.pdf_document or not self.pdf_path:
             return
+        self.geometry_cache_start_time = time.time()
+        self.geometry_futures[("cache", self.pdf_path)] = self.get_geometry_executor().submit(
+            open_geometry_cache, self.pdf_path, self.LINE_MIN_LENGTH_PTS, self.pdf_document.page_count)
+        self.schedule_geometry_poll()
+
+    def is_geometry_cache_pending(self):
+        return ("cache", self.pdf_path) in self.geometry_futures
+
+    def apply_geometry_cache(self, cache, cached_pages):
+        """Installe le cache de géométrie ouvert en arrière-plan: les pages en cache sont chargées, celles extraites
+           à la demande entre-temps y sont enregistrées, puis les pages restantes sont extraites en arrière-plan."""
+        self.geometry_cache = cache
+        if cache is not None:
+            for page_index, page_lines in self.lines_by_page.items():
+                if page_index not in cached_pages:
+                    intersections = self.intersections_by_page.get(page_index)
+                    if isinstance(intersections, PointGridIndex):
+                        intersections = intersections.points
+                    cache.save_page(page_index, page_lines, self.curves_by_page.get(page_index, EMPTY_CURVES), intersections)
+        loaded = 0
+        for page_index, (page_lines, curves, intersections) in cached_pages.items():
+            if page_index in self.lines_by_page:
+                continue # Extracted on demand meanwhile
+            # Indexes are rebuilt lazily, on the first snap on the page
+            self.lines_by_page[page_index] = page_lines
+            self.curves_by_page[page_index] = curves
+            if intersections is not None:
+                self.intersections_by_page[page_index] = intersections
+            loaded += 1
+        if loaded:
+            self.invalidate_snap_cache()
+            print(f"Cache géométrie: {loaded}/{self.pdf_document.page_count} pages chargées en {time.time() - self.geometry_cache_start_time:.3f}s.")
+
+        if not self.is_page_lines_ready(self.current_page):
+            self.root.after_idle(self.ensure_page_lines, self.current_page)
+        else:
+            if self.current_page not in self.intersections_by_page:
+                self.request_page_intersections(self.current_page)
+            if self.current_page in cached_pages and self.show_detected_lines.get():
+                self.display_detected_lines()
+        self.start_background_line_extraction()
+
+    def is_page_lines_ready(self, page_index):
+        """Indique si les lignes d'une page sont déjà extraites (présentes dans le cache)."""
+        return page_index in self.lines_by_page
+
+    def store_page_lines(self, page_index, page_lines, curves=EMPTY_CURVES, intersections=None, build_index=True):
+        """Enregistre les segments (et points de courbes) extraits d'une page dans le cache et construit son index spatial.
+           Avec build_index=False, l'index est construit plus tard, à la première recherche de snap.
+           Sans intersections (page extraite sur le thread Tk), elles sont calculées en arrière-plan."""
+        self.lines_by_page[page_index] = page_lines
+        self.curves_by_page[page_index] = dict(curves)
+        if self.geometry_cache is not None:
+            self.geometry_cache.save_page(page_index, page_lines, curves, intersections)
+        if build_index:
+            self.line_index_by_page[page_index] = SegmentGridIndex(page_lines)
+        else:
+            self.line_index_by_page.pop(page_index, None)
+        stale = self.geometry_futures.pop(("intersections", page_index), None) # Computed from the previous lines
+        if stale is not None:
+            stale.cancel() # Every submitted job stays cancellable: shutdown() does not cancel pending work on Python 3.8
+        if intersections is not None:
+            self.intersections_by_page[page_index] = intersections # Indexed on first use
+        else:
+            self.intersections_by_page.pop(page_index, None)
+            if page_index == self.current_page:
+                self.request_page_intersections(page_index)
+        self.invalidate_snap_cache()
+        self.line_tile_cache.discard_page(page_index) # Only this page's layer was rendered from the previous lines
+
+        # Show the lines as soon as they are available for the page being viewed
+        if page_index == self.current_page and self.show_detected_lines.get():
+            self.display_detected_lines()
 
-        self.status_bar.config(text="Extraction des lignes (peut prendre du temps)...")
-        self.root.update_idletasks()
-
-        self.lines_by_page = {}
-        total_lines_extracted = 0
+    def get_page_line_index(self, page_index):
+        """Retourne l'index spatial des segments d'une page, en le construisant au besoin."""
+        line_index = self.line_index_by_page.get(page_index)
+        if line_index is None:
+            page_lines = self.ensure_page_lines(page_index)
+            if page_lines is None:
+                return None
+            line_index = self.line_index_by_page.get(page_index)
+            if line_index is None:
+                line_index = SegmentGridIndex(page_lines)
+                self.line_index_by_page[page_index] = line_index
+        return line_index
+
+    def get_page_curves(self, page_index):
+        """Retourne les points d'accrochage des courbes d'une page (avec leur index spatial, construit au besoin),
+           ou None si la page n'est pas encore extraite."""
+        curves = self.curves_by_page.get(page_index)
+        if curves is not None and "index" not in curves:
+            curves["index"] = PointGridIndex(curves["points"])
+        return curves
+
+    def ensure_page_lines(self, page_index):
+        """Retourne les segments d'une page, en les extrayant à la demande s'ils ne sont pas encore en cache."""
+        page_lines = self.lines_by_page.get(page_index)
+        if page_lines is not None:
+            return page_lines
+        if not self.pdf_document or not (0 <= page_index < self.pdf_document.page_count):
+            return None
 
-        # Define a minimum length to filter out very small segments (noise)
-        # Use squared length in PDF points (1/72 inch) for efficiency
-        min_length_pts = 3 # Ignore lines shorter than ~1mm
-        min_line_length_sq = min_length_pts**2
+        page_lines, curves = EMPTY_SEGMENTS, EMPTY_CURVES
+        try:
+            # Segments are kept as a contiguous (N, 4) float32 array per page
+            page_lines, curves = extract_page_segments(self.pdf_document[page_index], self.LINE_MIN_LENGTH_PTS)
+        except Exception as e:
+            print(f"Avertissement: Erreur lors de l'extraction des dessins de la page {page_index + 1}: {str(e)}")
+        self.store_page_lines(page_index, page_lines, curves)
+        return page_lines
+
+    def start_background_line_extraction(self):
+        """Lance l'extraction des pages restantes dans un pool de processus, sans bloquer l'interface.
+           Les résultats sont récupérés sur le thread Tk par scrutation (root.after)."""
+        self.cancel_line_extraction(update_status=False)
+        if not self.pdf_document or not self.pdf_path:
+            return
 
-        start_time = time.time()
+        pending = [i for i in range(self.pdf_document.page_count) if i not in self.lines_by_page]
+        if not pending:
+            return
+        # Pages near the one being viewed are the most likely to be visited next
+        pending.sort(key=lambda i: abs(i - self.current_page))
 
-        for page_index in range(self.pdf_document.page_count):
-            page = self.pdf_document[page_index]
-            page_lines = []
-            try:
-                # Use get_drawings() which extracts vector paths
-                paths = page.get_drawings()
-                for path in paths:
-                    # Items represent points in lines, curves, rects
-                    # path: {'color': (r,g,b), 'fill': (r,g,b), 'rect': Rect(...), 'items': [('l', Point(x,y)), ('c', ...)], 'type': 'f'/'s'/'fs'}
-                    items = path.get("items")
-                    if not items: continue
-
-                    # Process simple lines ('l') and rectangle borders ('re')
-                    # type 's' is stroke, 'f' is fill, 'fs' is fill then stroke
-                    if path.get("type") in ['s','fs']: # Only consider stroked paths for lines
-                        current_pos = None
-                        for i in range(len(items)):
-                            op = items[i][0] # Operation: 'm' (moveto), 'l' (lineto), 'c' (curveto), 're' (rect)
-                            pt = items[i][1] # Point object
-
-                            if op == 'm': # Move To
-                                current_pos = (pt.x, pt.y)
-                            elif op == 'l': # Line To
-                                if current_pos:
-                                     p1 = current_pos
-                                     p2 = (pt.x, pt.y)
-                                     # Check length
-                                     dx = p2[0] - p1[0]
-                                     dy = p2[1] - p1[1]
-                                     if (dx*dx + dy*dy) >= min_line_length_sq:
-                                         page_lines.append(((p1[0], p1[1]), (p2[0], p2[1])))
-                                         total_lines_extracted += 1
-                                current_pos = (pt.x, pt.y) # Update current position
-                            elif op == 're': # Rectangle
-                                rect = items[i][1] # Rect object
-                                if rect and rect.is_valid and not rect.is_empty:
-                                    p1 = (rect.x0, rect.y0); p2 = (rect.x1, rect.y0)
-                                    p3 = (rect.x1, rect.y1); p4 = (rect.x0, rect.y1)
-                                    segments = [(p1, p2), (p2, p3), (p3, p4), (p4, p1)]
-                                    for seg_start, seg_end in segments:
-                                         dx = seg_end[0] - seg_start[0]
-                                         dy = seg_end[1] - seg_start[1]
-                                         if (dx*dx + dy*dy) >= min_line_length_sq:
-                                              page_lines.append((seg_start, seg_end))
-                                              total_lines_extracted += 1
-                                # Where does 're' leave current_pos? Assume bottom-left? Let's reset.
-                                current_pos = None # Reset position after rect? Or is it implicit? Assume reset.
-                            # Ignore curves ('c') for simple line snapping for now
-                            # 'h' (close path) - draw line back to start? Depends on path start. Ignore for now.
+        try:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+            self.line_extraction_executor = ProcessPoolExecutor(max_workers=workers)
+            # Small batches: the first results arrive quickly and cancel stays responsive
+            batch_size = max(1, min(8, len(pending) // (workers * 4)))
+            self.line_extraction_futures = [
+                self.line_extraction_executor.submit(extract_segments_worker, self.pdf_path,
+                                                     pending[i:i + batch_size], self.LINE_MIN_LENGTH_PTS)
+                for i in range(0, len(pending), batch_size)
+            ]
+        except Exception as e:
+            print(f"Avertissement: Pool de processus indisponible ({e}), extraction sur le thread principal.")
+            self._shutdown_line_extraction_executor()
+            self._line_extraction_job = self.root.after(100, self._extract_next_pending_page)
+            return
 
+        self.line_extraction_total = len(pending)
+        self.line_extraction_done = 0
+        self.line_extraction_start_time = time.time()
+        self.extraction_progress.config(maximum=self.line_extraction_total, value=0)
+        self.extraction_progress_label.config(text=f"Lignes: 0/{self.line_extraction_total}")
+        self.extraction_progress_frame.pack(side=tk.RIGHT)
+        self._line_extraction_job = self.root.after(100, self._poll_line_extraction)
+
+    def _poll_line_extraction(self):
+        """Récupère les lots terminés par le pool de processus et met à jour la progression."""
+        self._line_extraction_job = None
+        if self.line_extraction_executor is None:
+            return
 
+        still_running = []
+        for future in self.line_extraction_futures:
+            if not future.done():
+                still_running.append(future)
+                continue
+            try:
+                results = future.result()
             except Exception as e:
-                print(f"Avertissement: Erreur lors de l'extraction des dessins de la page {page_index + 1}: {str(e)}")
+                print(f"Avertissement: Échec d'un lot d'extraction en arrière-plan: {e}")
+                continue # The pages of this batch will be extracted on demand
+            for page_index, page_lines, curves, intersections in results:
+                if page_index not in self.lines_by_page: # Already extracted on demand otherwise
+                    self.store_page_lines(page_index, page_lines, curves, intersections, build_index=False)
+                self.line_extraction_done += 1
+        self.line_extraction_futures = still_running
+
+        self.extraction_progress.config(value=self.line_extraction_done)
+        self.extraction_progress_label.config(text=f"Lignes: {self.line_extraction_done}/{self.line_extraction_total}")
+
+        if still_running:
+            self._line_extraction_job = self.root.after(100, self._poll_line_extraction)
+            return
 
-            self.lines_by_page[page_index] = page_lines
-            # Provide progress update if many pages?
-            if self.pdf_document.page_count > 10 and (page_index + 1) % 5 == 0:
-                 elapsed = time.time() - start_time
-                 print(f"Extraction lignes... Page {page_index+1}/{self.pdf_document.page_count} ({elapsed:.1f}s)")
-                 self.status_bar.config(text=f"Extraction lignes... {page_index+1}/{self.pdf_document.page_count}")
-                 self.root.update_idletasks()
+        self._shutdown_line_extraction_executor()
+        self.extraction_progress_frame.pack_forget()
+        total_lines = sum(len(lines) for lines in self.lines_by_page.values())
+        elapsed = time.time() - self.line_extraction_start_time
+        reduction_text = self.get_line_reduction_text()
+        print(f"Extraction lignes terminée en {elapsed:.2f} secondes: {total_lines} segments{reduction_text}.")
+        self.status_bar.config(text=f"Extraction lignes terminée: {total_lines} segments détectés{reduction_text}.")
+
+    def get_line_reduction_text(self):
+        """Texte de la réduction obtenue par la normalisation des segments droits (doublons et colinéaires fusionnés)."""
+        raw_count = sum(curves["raw_count"] for curves in self.curves_by_page.values())
+        kept_count = sum(curves["start"] for curves in self.curves_by_page.values())
+        if raw_count <= 0 or kept_count >= raw_count:
+            return ""
+        return f" (doublons/colinéaires fusionnés: -{100.0 * (raw_count - kept_count) / raw_count:.1f}%, {raw_count} -> {kept_count})"
+
+    def cancel_line_extraction(self, update_status=True):
+        """Annule l'extraction des lignes en arrière-plan; les pages restantes seront extraites à la demande."""
+        if self._line_extraction_job is not None:
+            self.root.after_cancel(self._line_extraction_job)
+            self._line_extraction_job = None
+        was_running = self.line_extraction_executor is not None
+        self._shutdown_line_extraction_executor()
+        self.extraction_progress_frame.pack_forget()
+        if was_running and update_status:
+            self.status_bar.config(text="Extraction des lignes annulée (les pages seront analysées à l'affichage).")
+
+    def _shutdown_line_extraction_executor(self):
+        """Arrête le pool de processus d'extraction sans attendre les lots en cours."""
+        for future in self.line_extraction_futures:
+            future.cancel()
+        self.line_extraction_futures = []
+        if self.line_extraction_executor is not None:
+            self.line_extraction_executor.shutdown(wait=False) # Pending futures were cancelled above (cancel_futures needs Python 3.9)
+            self.line_extraction_executor = None
+
+    def _extract_next_pending_page(self):
+        """Extrait la page en attente la plus proche de la page courante, puis replanifie la suivante.
+           Repli utilisé quand le pool de processus ne peut pas être créé."""
+        self._line_extraction_job = None
+        if not self.pdf_document:
+            return
 
+        pending = [i for i in range(self.pdf_document.page_count) if i not in self.lines_by_page]
+        if not pending:
+            total_lines = sum(len(lines) for lines in self.lines_by_page.values())
+            reduction_text = self.get_line_reduction_text()
+            print(f"Extraction lignes terminée: {total_lines} segments sur {self.pdf_document.page_count} pages{reduction_text}.")
+            self.status_bar.config(text=f"Extraction lignes terminée: {total_lines} segments détectés{reduction_text}.")
+            return
 
-        end_time = time.time()
-        print(f"Extraction lignes terminée en {end_time - start_time:.2f} secondes.")
-        self.status_bar.config(text=f"Extraction lignes terminée: {total_lines_extracted} segments détectés.")
+        page_index = min(pending, key=lambda i: abs(i - self.current_page))
+        self.ensure_page_lines(page_index)
+        if len(pending) > 1:
+            self._line_extraction_job = self.root.after(1, self._extract_next_pending_page)
 
-        # Optionally redraw detected lines if visible
-        if self.show_detected_lines.get():
-            self.display_detected_lines()
+    def extract_lines_from_pdf(self):
+        """Extrait (à nouveau) les lignes et segments de toutes les pages du document PDF actuel pour snapping.
+           L'extraction se fait en arrière-plan; la page courante est traitée immédiatement."""
+        if not self.pdf_document:
+            return
 
+        self.status_bar.config(text="Extraction des lignes en arrière-plan...")
+        self.reset_line_cache()
+        self.ensure_page_lines(self.current_page)
+        self.start_background_line_extraction()
 
     def display_page(self):
         """Affiche la page courante du PDF sur le canvas."""
@@ -3000,32 +4433,32 @@ class MetrePDFApp:
              if self.pdf_document.page_count == 0: return # No pages
 
         self.canvas.delete("all") # Clear previous drawings
+        if self._zoom_refine_job is not None: # This redraw is the refinement of any fast zoom in progress
+            self.root.after_cancel(self._zoom_refine_job)
+            self._zoom_refine_job = None
+        self.zoom_snapshot = None
+        self._zoom_snapshot_photoimage = None
 
         try:
             page = self.pdf_document[self.current_page]
 
-            # Calculate the transformation matrix for zoom level
             # Use a higher resolution factor for rendering than just the zoom factor
             # This makes text sharper when zoomed in.
             display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5 # Render at least 1.5x, more if zoomed
-            mat = fitz.Matrix(display_resolution_factor, display_resolution_factor)
-
-            # Render the page to a Pixmap
-            pix = page.get_pixmap(matrix=mat, alpha=False) # alpha=False for opaque RGB
+            page_width = int(math.ceil(page.rect.width * display_resolution_factor))
+            page_height = int(math.ceil(page.rect.height * display_resolution_factor))
 
-            # Convert Pixmap to a PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            # White sheet under the tiles, visible while tiles are being rendered
+            self.canvas.create_rectangle(0, 0, page_width, page_height, fill="white", outline="", tags="page_background")
 
-            # Convert PIL Image to PhotoImage for Tkinter
-            # Store reference to avoid garbage collection
-            self._current_page_photoimage = ImageTk.PhotoImage(image=img)
+            # Configure the scroll region to match the rendered page size
+            self.canvas.config(scrollregion=(0, 0, page_width, page_height))
 
-            # Display the image on the canvas
-            # The image coordinates are scaled by display_resolution_factor relative to PDF points
-            self.canvas.create_image(0, 0, image=self._current_page_photoimage, anchor=tk.NW, tags="page_image")
-
-            # Configure the scroll region to match the image size
-            self.canvas.config(scrollregion=(0, 0, pix.width, pix.height))
+            # Only the tiles intersecting the viewport are rendered (see update_visible_tiles)
+            # (the detected-lines layer, when enabled, is tiled on the same grid)
+            self.tile_items = {}
+            self.line_tile_items = {}
+            self.update_visible_tiles()
 
             # Update page navigation label
             page_text = f"Page: {self.current_page + 1}/{self.pdf_document.page_count}"
@@ -3034,303 +4467,984 @@ class MetrePDFApp:
             # Redraw measurements for the current page AFTER displaying the page image
             self.redraw_measurements()
 
-            # Redraw detected lines if the option is enabled
-            if self.show_detected_lines.get():
-                 self.display_detected_lines()
+            # Lines of a pending page are extracted right after the page is shown (lazy cache),
+            # its intersections are then computed in the background (see store_page_lines).
+            # While the disk cache is being looked up, apply_geometry_cache takes care of it.
+            if not self.is_geometry_cache_pending():
+                 if not self.is_page_lines_ready(self.current_page):
+                      self.root.after_idle(self.ensure_page_lines, self.current_page)
+                 elif self.current_page not in self.intersections_by_page:
+                      self.request_page_intersections(self.current_page)
 
         except Exception as e:
             messagebox.showerror("Erreur d'Affichage", f"Impossible d'afficher la page {self.current_page + 1}:\n{str(e)}", parent=self.root)
             self.canvas.delete("all") # Clear canvas on error
 
-    def redraw_measurements(self):
-        """Redessine toutes les mesures visibles sur la page courante, en surlignant la mesure sélectionnée."""
-        if not self.pdf_document:
+    def on_canvas_xscroll(self, first, last):
+        """Met à jour la barre de défilement horizontale et les tuiles visibles."""
+        self.h_scrollbar.set(first, last)
+        self.schedule_tile_update()
+        self.schedule_overlay_update()
+
+    def on_canvas_yscroll(self, first, last):
+        """Met à jour la barre de défilement verticale et les tuiles visibles."""
+        self.v_scrollbar.set(first, last)
+        self.schedule_tile_update()
+        self.schedule_overlay_update()
+
+    def schedule_tile_update(self):
+        """Regroupe les changements de vue successifs en une seule mise à jour des tuiles."""
+        if self._tile_update_job is None:
+            self._tile_update_job = self.root.after_idle(self.update_visible_tiles)
+
+    def get_visible_tile_range(self, display_resolution_factor, page_index=None):
+        """Retourne (tx0, ty0, tx1, ty1), les indices (inclusifs) des tuiles recouvrant la zone visible
+           (pour la page courante, ou pour page_index affichée à la même position de défilement)."""
+        if page_index is None:
+            page_index = self.current_page
+        page_rect = self.pdf_document[page_index].rect
+        max_tx = max(0, int(math.ceil(page_rect.width * display_resolution_factor / TILE_SIZE)) - 1)
+        max_ty = max(0, int(math.ceil(page_rect.height * display_resolution_factor / TILE_SIZE)) - 1)
+
+        view_x0 = self.canvas.canvasx(0)
+        view_y0 = self.canvas.canvasy(0)
+        view_x1 = view_x0 + max(self.canvas.winfo_width(), 1)
+        view_y1 = view_y0 + max(self.canvas.winfo_height(), 1)
+
+        tx0 = min(max(int(view_x0 // TILE_SIZE), 0), max_tx)
+        ty0 = min(max(int(view_y0 // TILE_SIZE), 0), max_ty)
+        tx1 = min(max(int(view_x1 // TILE_SIZE), 0), max_tx)
+        ty1 = min(max(int(view_y1 // TILE_SIZE), 0), max_ty)
+        return tx0, ty0, tx1, ty1
+
+    def update_visible_tiles(self):
+        """Affiche les tuiles de la zone visible depuis le cache LRU, et demande au processus de rendu
+           celles qui manquent; l'aperçu basse résolution de la page couvre la vue en attendant."""
+        self._tile_update_job = None
+        if not self.pdf_document or not (0 <= self.current_page < self.pdf_document.page_count):
             return
 
-        self.canvas.delete("measurement") # Clear only measurement items
+        if self._zoom_refine_job is not None:
+            # Fast zoom in progress: the tiles shown when it started are resampled over the preview (which only
+            # fills the areas they don't cover), tiles are requested once zoom settles
+            self.request_page_preview(self.current_page)
+            self.update_preview_layer()
+            self.update_zoom_snapshot_layer()
+            self.canvas.tag_lower("zoom_snapshot")
+            self.canvas.tag_lower("page_preview")
+            self.canvas.tag_lower("page_background")
+            return
 
         display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
-        highlight_color = "yellow" # Couleur de surbrillance
-        highlight_width_increase = 2 # Augmentation de l'épaisseur pour la surbrillance
+        zoom_level = tile_zoom_key(display_resolution_factor)
+        tx0, ty0, tx1, ty1 = self.get_visible_tile_range(display_resolution_factor)
+        visible = {(tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)}
+
+        for tile in list(self.tile_items):
+            if tile not in visible:
+                self.canvas.delete(self.tile_items.pop(tile))
+
+        # Renders that a newer page, zoom or scroll position made useless are dropped before they start
+        wanted = {(self.current_page, zoom_level, tx, ty) for tx, ty in visible}
+        prefetch = self.get_prefetch_tile_keys(display_resolution_factor)
+        wanted.update(prefetch)
+        for key, future in list(self.render_futures.items()):
+            if key[0] != "preview" and key not in wanted and future.cancel():
+                del self.render_futures[key]
+
+        missing = []
+        for tile_x, tile_y in sorted(visible - set(self.tile_items)):
+            key = (self.current_page, zoom_level, tile_x, tile_y)
+            photo = self.tile_cache.get(key)
+            if photo is None:
+                missing.append(key)
+                continue
+            self.tile_items[(tile_x, tile_y)] = self.canvas.create_image(
+                tile_x * TILE_SIZE, tile_y * TILE_SIZE, image=photo, anchor=tk.NW, tags="page_image")
+
+        if missing:
+            self.request_page_preview(self.current_page)
+            for key in missing:
+                self.request_render(key)
+        else:
+            # Current view complete: prefetch the same area of the neighbouring pages at the current zoom
+            for key in prefetch:
+                if self.tile_cache.get(key) is None:
+                    self.request_render(key)
+            for page_index in (self.current_page - 1, self.current_page + 1):
+                if 0 <= page_index < self.pdf_document.page_count:
+                    self.request_page_preview(page_index)
+        # Tiles already on the canvas are not looked up again: keep them most recent, after the prefetch lookups
+        self.tile_cache.touch((self.current_page, zoom_level, tx, ty) for tx, ty in self.tile_items)
+        self.update_preview_layer(show=bool(missing))
 
-        for measure in self.measures:
-            if measure.get("page") == self.current_page:
-                measure_id = measure.get('id')
-                measure_type = measure.get("type")
-                pdf_points = measure.get("points", [])
-                display_text = measure.get("display_text", "")
-
-                # Est-ce la mesure sélectionnée ?
-                is_selected = (measure_id is not None and measure_id == self.selected_measure_id)
-
-                scaled_points = [(p[0] * display_resolution_factor, p[1] * display_resolution_factor) for p in pdf_points]
-
-                if not scaled_points: continue
-
-                # --- NEW: Determine Color ---
-                # 1. Get measure-specific color, if defined and valid
-                measure_specific_color = measure.get('color')
-                is_valid_specific_color = (isinstance(measure_specific_color, str) and
-                                           measure_specific_color.startswith('#') and
-                                           len(measure_specific_color) == 7)
-
-                # 2. Get default global colors
-                base_distance_color = self.distance_color.get()
-                base_surface_outline = self.surface_color.get()
-                base_surface_fill = self.surface_fill_color.get()
-                base_perimeter_color = self.colors.get("perimeter", "#FFA500")
-                base_angle_color = self.angle_color.get()
-                base_point_color = self.point_color.get()
-                base_width = 2
-
-                # 3. Decide drawing colors based on type and specific color availability
-                draw_color = base_distance_color # Default fallback for outlines
-
-                # MODIFICATION: Utiliser la couleur spécifique pour le remplissage plutôt que pour le contour
-                # Initialiser la couleur de remplissage par défaut
-                fill_color = base_surface_fill # Couleur de remplissage par défaut
-
-                # Si une couleur spécifique est définie pour la mesure, l'utiliser pour le remplissage
-                if is_valid_specific_color:
-                    fill_color = measure_specific_color
-
-                # Pour les contours, utiliser les couleurs par défaut
-                if measure_type == "distance":
-                    draw_color = base_distance_color
-                elif measure_type == "surface":
-                    draw_color = base_surface_outline
-                elif measure_type == "perimeter":
-                    draw_color = base_perimeter_color
-                elif measure_type == "angle":
-                    draw_color = base_angle_color
-
-                point_color = base_point_color # Use global point color
-
-                # --- Apply Highlight Override ---
-                current_draw_color = draw_color
-                current_fill_color = fill_color
-                current_point_color = point_color
-                current_width = base_width
-
-                if is_selected:
-                    current_draw_color = highlight_color
-                    # Ne pas changer la couleur de remplissage en cas de surbrillance
-                    # pour garder la couleur du produit visible
-                    # current_fill_color = highlight_color
-                    current_point_color = highlight_color
-                    current_width = base_width + highlight_width_increase
-
-                # Determine text color (use original draw_color before highlight applied, or highlight color)
-                current_text_color = highlight_color if is_selected else draw_color
-
-                m_tag = f"measure_{measure_id}"
-                all_tags = ("measurement", m_tag)
-
-                # --- Draw based on type (using determined colors) ---
-                if measure_type == "distance" and len(scaled_points) == 2:
-                    # Pour les distances, on continue à utiliser current_draw_color pour la ligne
-                    x1, y1 = scaled_points[0]; x2, y2 = scaled_points[1]
-                    self.canvas.create_oval(x1-3, y1-3, x1+3, y1+3, fill=current_point_color, outline=current_point_color, tags=all_tags)
-                    self.canvas.create_oval(x2-3, y2-3, x2+3, y2+3, fill=current_point_color, outline=current_point_color, tags=all_tags)
-                    self.canvas.create_line(x1, y1, x2, y2, fill=current_draw_color, width=current_width, tags=all_tags)
-                    text_x = (x1 + x2) / 2; text_y = (y1 + y2) / 2
-                    self.draw_measure_text(text_x, text_y, display_text, current_text_color, all_tags, highlight=is_selected)
-
-                elif measure_type == "surface" and len(scaled_points) >= 3:
-                    stipple = self.get_stipple_pattern()
-                    flat_points = [coord for point in scaled_points for coord in point]
-                    try:
-                        # Utiliser current_fill_color pour le remplissage (avec la couleur du produit si définie)
-                        poly_id = self.canvas.create_polygon(flat_points,
-                                                fill=current_fill_color,    # Couleur du produit ou couleur par défaut
-                                                outline=current_draw_color, # Couleur de contour standard
-                                                width=current_width,
-                                                stipple=stipple,
-                                                tags=all_tags)
-                    except tk.TclError as e:
-                        print(f"Erreur TclError lors du dessin du polygone: {e} - Points: {flat_points}")
-                        continue
+        if self.show_detected_lines.get():
+            self.update_detected_lines_tiles()
+
+        # Tiles stay under the measurements and detected lines, the preview under the tiles
+        self.canvas.tag_lower("page_image")
+        self.canvas.tag_lower("page_preview")
+        self.canvas.tag_lower("page_background")
+
+    def get_prefetch_tile_keys(self, display_resolution_factor):
+        """Clés des tuiles de current_page±1 couvrant la même zone que la vue actuelle."""
+        zoom_level = tile_zoom_key(display_resolution_factor)
+        keys = set()
+        for page_index in (self.current_page - 1, self.current_page + 1):
+            if not (0 <= page_index < self.pdf_document.page_count):
+                continue
+            tx0, ty0, tx1, ty1 = self.get_visible_tile_range(display_resolution_factor, page_index)
+            keys.update((page_index, zoom_level, tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1))
+        return keys
+
+    def get_render_executor(self):
+        """Retourne le pool de processus de rendu (créé à la première utilisation), ou None s'il est indisponible."""
+        if self.render_executor is None:
+            try:
+                self.render_executor = ProcessPoolExecutor(max_workers=2)
+            except Exception as e:
+                print(f"Avertissement: Rendu en arrière-plan indisponible ({e}), rendu sur le thread principal.")
+                return None
+        return self.render_executor
 
-                    for x, y in scaled_points:
-                        self.canvas.create_oval(x-3, y-3, x+3, y+3, fill=current_point_color, outline=current_point_color, tags=all_tags)
+    def request_render(self, key):
+        """Demande le rendu d'une tuile (page, zoom_level, tile_x, tile_y) en arrière-plan."""
+        if key in self.render_futures or not self.pdf_path:
+            return
+        page_index, zoom_level, tile_x, tile_y = key
+        executor = self.get_render_executor()
+        if executor is None:
+            if page_index != self.current_page:
+                return # No prefetch without background rendering
+            # Fallback: synchronous render
+            img = render_page_tile(self.pdf_document[page_index], zoom_level, tile_x, tile_y)
+            if img is not None:
+                self.tile_cache.put(key, ImageTk.PhotoImage(image=img), img.width, img.height, image=img)
+                self.schedule_tile_update()
+            return
+        self.render_futures[key] = executor.submit(render_image_worker, self.pdf_path, page_index,
+                                                   zoom_level, (tile_x, tile_y))
+        self.schedule_render_poll()
+
+    def request_page_preview(self, page_index):
+        """Demande l'aperçu basse résolution d'une page, s'il n'est pas déjà en cache."""
+        key = ("preview", page_index)
+        if page_index in self.page_previews or key in self.render_futures or not self.pdf_path:
+            return
+        executor = self.get_render_executor()
+        if executor is None:
+            return # The tiles are rendered synchronously, no preview needed
+        page_rect = self.pdf_document[page_index].rect
+        preview_factor = min(PAGE_PREVIEW_MAX_SIZE / max(page_rect.width, page_rect.height, 1), 1.5)
+        self.render_futures[key] = executor.submit(render_image_worker, self.pdf_path, page_index, preview_factor)
+        self.schedule_render_poll()
+
+    def schedule_render_poll(self):
+        if self._render_poll_job is None:
+            self._render_poll_job = self.root.after(20, self._poll_render_results)
+
+    def _poll_render_results(self):
+        """Récupère les rendus terminés (sur le thread Tk) et ignore ceux devenus obsolètes."""
+        self._render_poll_job = None
+        current_zoom_level = tile_zoom_key(max(self.zoom_factor, 1.0) * 1.5)
+        received = False
+        for key, future in list(self.render_futures.items()):
+            if not future.done():
+                continue
+            del self.render_futures[key]
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Avertissement: Échec du rendu {key}: {e}")
+                continue
+            if result is None:
+                continue
+            width, height, samples = result
+            img = Image.frombytes("RGB", (width, height), samples)
+            if key[0] == "preview":
+                self.page_previews[key[1]] = img
+                while len(self.page_previews) > self.MAX_PAGE_PREVIEWS:
+                    self.page_previews.popitem(last=False)
+                received = received or key[1] == self.current_page
+            elif key[1] == current_zoom_level and abs(key[0] - self.current_page) <= 1:
+                # Tiles of the current page, or prefetched for current_page±1
+                self.tile_cache.put(key, ImageTk.PhotoImage(image=img), width, height, image=img)
+                received = received or key[0] == self.current_page
+            # Otherwise the render is stale (page or zoom changed meanwhile): dropped
+
+        if received:
+            self.schedule_tile_update()
+        if self.render_futures:
+            self.schedule_render_poll()
+
+    def update_preview_layer(self, show=True):
+        """Affiche l'aperçu basse résolution de la page, recadré et agrandi à la zone visible seulement."""
+        self.canvas.delete("page_preview")
+        self._preview_photoimage = None
+        preview = self.page_previews.get(self.current_page)
+        if not show or preview is None:
+            return
+        self.page_previews.move_to_end(self.current_page)
 
-                    if scaled_points:
-                        cx = sum(p[0] for p in scaled_points) / len(scaled_points)
-                        cy = sum(p[1] for p in scaled_points) / len(scaled_points)
-                        self.draw_measure_text(cx, cy, display_text, current_text_color, all_tags, highlight=is_selected)
+        display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
+        page_rect = self.pdf_document[self.current_page].rect
+        page_width = page_rect.width * display_resolution_factor
+        page_height = page_rect.height * display_resolution_factor
+
+        # Visible part of the page, in canvas pixels
+        view_x0 = max(self.canvas.canvasx(0), 0)
+        view_y0 = max(self.canvas.canvasy(0), 0)
+        view_x1 = min(self.canvas.canvasx(0) + self.canvas.winfo_width(), page_width)
+        view_y1 = min(self.canvas.canvasy(0) + self.canvas.winfo_height(), page_height)
+        if view_x1 - view_x0 < 1 or view_y1 - view_y0 < 1:
+            return
 
-                elif measure_type == "perimeter" and len(scaled_points) >= 2:
-                    flat_perimeter_points = [coord for point in scaled_points for coord in point]
-                    if len(scaled_points) > 2:
-                        flat_perimeter_points.extend(scaled_points[0])
+        # Crop on whole preview pixels, then stretch the crop to its size on the canvas
+        scale_x = preview.width / page_width
+        scale_y = preview.height / page_height
+        left, top = int(view_x0 * scale_x), int(view_y0 * scale_y)
+        right = min(max(int(math.ceil(view_x1 * scale_x)), left + 1), preview.width)
+        bottom = min(max(int(math.ceil(view_y1 * scale_y)), top + 1), preview.height)
+        crop = preview.crop((left, top, right, bottom))
+        target_size = (max(int(round(crop.width / scale_x)), 1), max(int(round(crop.height / scale_y)), 1))
+        self._preview_photoimage = ImageTk.PhotoImage(image=crop.resize(target_size, Image.BILINEAR))
+        self.canvas.create_image(left / scale_x, top / scale_y, image=self._preview_photoimage,
+                                 anchor=tk.NW, tags="page_preview")
+
+    def capture_zoom_snapshot(self, resolution_factor):
+        """Assemble les tuiles affichées (rendues à resolution_factor) en une seule image RGBA, transparente
+           là où aucune tuile n'est affichée. Retourne (image, resolution_factor, x, y) ou None;
+           x/y = position de l'image sur le canvas à cette résolution."""
+        zoom_level = tile_zoom_key(resolution_factor)
+        tiles = []
+        for tx, ty in self.tile_items:
+            img = self.tile_cache.get_image((self.current_page, zoom_level, tx, ty))
+            if img is not None:
+                tiles.append((tx, ty, img))
+        if not tiles:
+            return None
+        tx0 = min(tile[0] for tile in tiles)
+        ty0 = min(tile[1] for tile in tiles)
+        width = (max(tile[0] for tile in tiles) - tx0 + 1) * TILE_SIZE
+        height = (max(tile[1] for tile in tiles) - ty0 + 1) * TILE_SIZE
+        mosaic = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        for tx, ty, img in tiles:
+            mosaic.paste(img, ((tx - tx0) * TILE_SIZE, (ty - ty0) * TILE_SIZE))
+        return mosaic, resolution_factor, tx0 * TILE_SIZE, ty0 * TILE_SIZE
+
+    def update_zoom_snapshot_layer(self):
+        """Affiche les tuiles capturées au début du zoom rapide, recadrées à la zone visible et mises à l'échelle
+           du zoom courant."""
+        self.canvas.delete("zoom_snapshot")
+        self._zoom_snapshot_photoimage = None
+        if self.zoom_snapshot is None:
+            return
+        mosaic, snapshot_resolution_factor, origin_x, origin_y = self.zoom_snapshot
+        scale = max(self.zoom_factor, 1.0) * 1.5 / snapshot_resolution_factor
+        mosaic_x, mosaic_y = origin_x * scale, origin_y * scale
+
+        # Visible part of the mosaic, in canvas pixels
+        view_x0 = max(self.canvas.canvasx(0), mosaic_x)
+        view_y0 = max(self.canvas.canvasy(0), mosaic_y)
+        view_x1 = min(self.canvas.canvasx(0) + self.canvas.winfo_width(), mosaic_x + mosaic.width * scale)
+        view_y1 = min(self.canvas.canvasy(0) + self.canvas.winfo_height(), mosaic_y + mosaic.height * scale)
+        if view_x1 - view_x0 < 1 or view_y1 - view_y0 < 1:
+            return
 
-                    try:
-                        self.canvas.create_line(flat_perimeter_points, fill=current_draw_color, width=current_width, tags=all_tags)
-                    except tk.TclError as e:
-                        print(f"Erreur TclError lors du dessin de la polyligne (périmètre): {e} - Points: {flat_perimeter_points}")
-                        continue
+        # Crop on whole mosaic pixels, then stretch the crop to its size on the canvas
+        left, top = int((view_x0 - mosaic_x) / scale), int((view_y0 - mosaic_y) / scale)
+        right = min(max(int(math.ceil((view_x1 - mosaic_x) / scale)), left + 1), mosaic.width)
+        bottom = min(max(int(math.ceil((view_y1 - mosaic_y) / scale)), top + 1), mosaic.height)
+        crop = mosaic.crop((left, top, right, bottom))
+        target_size = (max(int(round(crop.width * scale)), 1), max(int(round(crop.height * scale)), 1))
+        self._zoom_snapshot_photoimage = ImageTk.PhotoImage(image=crop.resize(target_size, Image.BILINEAR))
+        self.canvas.create_image(mosaic_x + left * scale, mosaic_y + top * scale, image=self._zoom_snapshot_photoimage,
+                                 anchor=tk.NW, tags="zoom_snapshot")
+
+    def shutdown_render_executor(self):
+        """Arrête le pool de processus de rendu."""
+        for future in self.render_futures.values():
+            future.cancel()
+        self.render_futures = {}
+        if self._render_poll_job is not None:
+            self.root.after_cancel(self._render_poll_job)
+            self._render_poll_job = None
+        if self.render_executor is not None:
+            self.render_executor.shutdown(wait=False) # Pending futures were cancelled above (cancel_futures needs Python 3.9)
+            self.render_executor = None
 
-                    for x, y in scaled_points:
-                        self.canvas.create_oval(x-3, y-3, x+3, y+3, fill=current_point_color, outline=current_point_color, tags=all_tags)
+    def redraw_measurements(self):
+        """Redessine toutes les mesures visibles sur la page courante, en surlignant la mesure sélectionnée.
+           Reconstruit entièrement la couche de mesures (changement de page, de zoom ou de couleurs);
+           les ajouts, suppressions et changements de sélection passent par les mises à jour ciblées
+           (add_measure_overlay, remove_measure_overlay, set_measure_highlight)."""
+        if not self.pdf_document:
+            return
 
-                    if scaled_points:
-                        cx = sum(p[0] for p in scaled_points) / len(scaled_points)
-                        cy = sum(p[1] for p in scaled_points) / len(scaled_points)
-                        self.draw_measure_text(cx, cy, display_text, current_text_color, all_tags, highlight=is_selected)
+        self.canvas.delete("measurement") # Clear only measurement items
+        self.measure_items = {}
+
+        # Only the measures near the viewport are materialized (see update_overlay_culling)
+        self.overlay_rect = self.get_view_rect_pdf(self.OVERLAY_VIEW_MARGIN)
+        visible_ids = self.get_measure_ids_in_rect(self.overlay_rect)
+        for measure in self.measures.on_page(self.current_page):
+            if measure.get("id") in visible_ids:
+                self.draw_measure(measure)
+
+    def get_view_rect_pdf(self, margin_ratio=0.0):
+        """Retourne la zone visible du canvas en coordonnées PDF (x0, y0, x1, y1),
+           agrandie de margin_ratio fois la taille de la vue de chaque côté."""
+        display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        view_x0 = self.canvas.canvasx(0) - width * margin_ratio
+        view_y0 = self.canvas.canvasy(0) - height * margin_ratio
+        view_x1 = self.canvas.canvasx(0) + width * (1 + margin_ratio)
+        view_y1 = self.canvas.canvasy(0) + height * (1 + margin_ratio)
+        return (view_x0 / display_resolution_factor, view_y0 / display_resolution_factor,
+                view_x1 / display_resolution_factor, view_y1 / display_resolution_factor)
+
+    def get_measure_index(self, page_index):
+        """Retourne l'index spatial des boîtes englobantes des mesures d'une page (construit à la demande)."""
+        index = self.measure_index_by_page.get(page_index)
+        if index is None:
+            index = BoxGridIndex()
+            for measure in self.measures.on_page(page_index):
+                index.insert(measure.get("id"), measure_bbox(measure.get("points", [])), measure)
+            self.measure_index_by_page[page_index] = index
+        return index
+
+    def reset_measure_index(self):
+        """Invalide les index spatiaux des mesures (liste des mesures remplacée)."""
+        self.measure_index_by_page = {}
+        self.invalidate_snap_cache() # Snap results may point to vertices of the old measures
+
+    def get_measure_ids_in_rect(self, rect):
+        """Identifiants des mesures de la page courante dont le dessin peut intersecter rect (PDF)."""
+        return self.get_measure_index(self.current_page).query_rect(*self.get_overlay_query_rect(rect))
+
+    def get_overlay_query_rect(self, rect):
+        """Agrandit rect (PDF) de la marge des étiquettes: une mesure dont la boîte touche ce rectangle
+           peut avoir un élément dessiné dans rect."""
+        margin = self.OVERLAY_LABEL_MARGIN_PX / (max(self.zoom_factor, 1.0) * 1.5)
+        x0, y0, x1, y1 = rect
+        return x0 - margin, y0 - margin, x1 + margin, y1 + margin
+
+    def find_measure_at(self, x_canvas, y_canvas, tolerance_px=None):
+        """Retourne la mesure de la page courante sous le point canvas (ou None).
+           Les candidats viennent de l'index spatial des mesures; le plus proche de son contour gagne,
+           l'intérieur d'une surface ne comptant qu'à défaut de contour proche (la plus petite d'abord)."""
+        if not self.pdf_document:
+            return None
+        if tolerance_px is None:
+            tolerance_px = self.HOVER_TOLERANCE_PX
+        display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
+        x_pdf = x_canvas / display_resolution_factor
+        y_pdf = y_canvas / display_resolution_factor
+        tolerance = tolerance_px / display_resolution_factor
+
+        index = self.get_measure_index(self.current_page)
+        best = None
+        best_score = None
+        for measure_id in index.query_rect(x_pdf - tolerance, y_pdf - tolerance, x_pdf + tolerance, y_pdf + tolerance):
+            measure = index.get(measure_id)
+            if measure is None:
+                continue
+            points = measure.get("points", [])
+            distance = measure_hit_distance(x_pdf, y_pdf, measure.get("type"), points)
+            if distance <= tolerance:
+                score = (0, distance)
+            elif measure.get("type") == "surface" and len(points) >= 3 and point_in_polygon(x_pdf, y_pdf, points):
+                bx0, by0, bx1, by1 = index.boxes[measure_id]
+                score = (1, (bx1 - bx0) * (by1 - by0))
+            else:
+                continue
+            if best_score is None or score < best_score:
+                best, best_score = measure, score
+        return best
+
+    def select_measure(self, measure_id):
+        """Sélectionne une mesure dans la liste (ce qui la surligne sur le plan), ou vide la sélection."""
+        self.measure_list_selection = set() if measure_id is None else {measure_id}
+        if measure_id is not None:
+            self.scroll_measure_list_to_id(measure_id)
+        self.render_measure_list_rows() # The selection event highlights the measure (on_measure_select)
+        self.on_measure_select()
+
+    def on_canvas_ctrl_click(self, event):
+        """Ctrl+clic: sélectionne la mesure sous le curseur (pour la modifier ou la supprimer avec [Suppr])."""
+        if not self.pdf_document or self.panning:
+            return
+        measure = self.find_measure_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        self.select_measure(measure.get("id") if measure else None)
+        if measure:
+            self.status_bar.config(text=f"Mesure sélectionnée: {measure.get('display_text', '')} ([Suppr] pour supprimer)")
+
+    def schedule_overlay_update(self):
+        if self._overlay_update_job is None:
+            self._overlay_update_job = self.root.after_idle(self.update_overlay_culling)
+
+    def update_overlay_culling(self):
+        """Après un défilement ou un panoramique, ajoute les mesures et lignes détectées entrées dans
+           la zone proche de la vue et retire celles qui en sont sorties."""
+        self._overlay_update_job = None
+        if not self.pdf_document or self.overlay_rect is None:
+            return
+        view_rect = self.get_view_rect_pdf()
+        ox0, oy0, ox1, oy1 = self.overlay_rect
+        if ox0 <= view_rect[0] and oy0 <= view_rect[1] and ox1 >= view_rect[2] and oy1 >= view_rect[3]:
+            return # The materialized area still covers the view
+
+        self.overlay_rect = self.get_view_rect_pdf(self.OVERLAY_VIEW_MARGIN)
+        visible_ids = self.get_measure_ids_in_rect(self.overlay_rect)
+        for measure_id in [m_id for m_id in self.measure_items if m_id not in visible_ids]:
+            self.remove_measure_overlay(measure_id)
+        for measure_id in visible_ids:
+            measure = self.measures.get(measure_id)
+            if measure is not None and measure_id not in self.measure_items and measure.get("page") == self.current_page:
+                self.draw_measure(measure)
+
+    def get_measure_style(self, measure, is_selected):
+        """Retourne les couleurs et épaisseurs de dessin d'une mesure (normale ou surlignée)."""
+        highlight_color = "yellow" # Couleur de surbrillance
+        highlight_width_increase = 2 # Augmentation de l'épaisseur pour la surbrillance
+        measure_type = measure.get("type")
+
+        # --- Determine Color ---
+        # 1. Get measure-specific color, if defined and valid
+        measure_specific_color = measure.get('color')
+        is_valid_specific_color = (isinstance(measure_specific_color, str) and
+                                   measure_specific_color.startswith('#') and
+                                   len(measure_specific_color) == 7)
+
+        # 2. Decide drawing colors based on type: the specific color (product) is used for the fill,
+        #    the outlines keep the default global colors
+        draw_color = self.distance_color.get() # Default fallback for outlines
+        if measure_type == "surface":
+            draw_color = self.surface_color.get()
+        elif measure_type == "perimeter":
+            draw_color = self.colors.get("perimeter", "#FFA500")
+        elif measure_type == "angle":
+            draw_color = self.angle_color.get()
+        fill_color = measure_specific_color if is_valid_specific_color else self.surface_fill_color.get()
+        base_width = 2
+
+        # --- Apply Highlight Override ---
+        # The fill color is kept when highlighted, so the product color stays visible
+        if is_selected:
+            return {"draw": highlight_color, "fill": fill_color, "point": highlight_color,
+                    "width": base_width + highlight_width_increase, "arc_width": base_width + highlight_width_increase,
+                    "text": highlight_color, "text_bg": "yellow"}
+        return {"draw": draw_color, "fill": fill_color, "point": self.point_color.get(),
+                "width": base_width, "arc_width": 1, "text": draw_color, "text_bg": "white"}
+
+    def draw_measure(self, measure):
+        """Dessine une mesure sur le canvas et enregistre ses éléments (par rôle) dans measure_items."""
+        display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
+        measure_id = measure.get('id')
+        measure_type = measure.get("type")
+        pdf_points = measure.get("points", [])
+        display_text = measure.get("display_text", "")
 
-                elif measure_type == "angle" and len(scaled_points) == 3:
-                    # Les angles utilisent toujours leur couleur spécifique
-                    p1, p2, p3 = scaled_points
-                    try:
-                        v1_x, v1_y = p1[0] - p2[0], p1[1] - p2[1]
-                        v2_x, v2_y = p3[0] - p2[0], p3[1] - p2[1]
-                        start_angle_rad = math.atan2(-v1_y, v1_x)
-                        end_angle_rad = math.atan2(-v2_y, v2_x)
-                        start_deg = math.degrees(start_angle_rad)
-
-                        raw_extent = math.degrees(end_angle_rad - start_angle_rad)
-                        while raw_extent > 180: raw_extent -= 360
-                        while raw_extent <= -180: raw_extent += 360
-                        extent_deg = raw_extent
-
-                        for x, y in scaled_points:
-                            self.canvas.create_oval(x-3, y-3, x+3, y+3, fill=current_point_color, outline=current_point_color, tags=all_tags)
-                        self.canvas.create_line(p1[0], p1[1], p2[0], p2[1], fill=current_draw_color, width=current_width, tags=all_tags)
-                        self.canvas.create_line(p2[0], p2[1], p3[0], p3[1], fill=current_draw_color, width=current_width, tags=all_tags)
-                        arc_radius = 20
-                        arc_bbox = (p2[0] - arc_radius, p2[1] - arc_radius, p2[0] + arc_radius, p2[1] + arc_radius)
-                        arc_width = current_width if is_selected else 1
-                        self.canvas.create_arc(arc_bbox, start=start_deg, extent=extent_deg,
-                                            style=tk.ARC, outline=current_draw_color, width=arc_width, tags=all_tags)
-                        mid_angle_rad = start_angle_rad + math.radians(extent_deg / 2.0)
-                        text_offset = arc_radius + 10
-                        text_x = p2[0] + text_offset * math.cos(mid_angle_rad)
-                        text_y = p2[1] - text_offset * math.sin(mid_angle_rad)
-                        self.draw_measure_text(text_x, text_y, display_text, current_text_color, all_tags, highlight=is_selected)
-                    except Exception as e:
-                        print(f"Erreur dessin angle: {e}")
-                        for x, y in scaled_points:
-                             self.canvas.create_oval(x-3, y-3, x+3, y+3, fill=current_point_color, outline=current_point_color, tags=all_tags)
+        scaled_points = [(p[0] * display_resolution_factor, p[1] * display_resolution_factor) for p in pdf_points]
+        if not scaled_points:
+            return
 
+        # Est-ce la mesure sélectionnée ?
+        is_selected = (measure_id is not None and measure_id == self.selected_measure_id)
+        style = self.get_measure_style(measure, is_selected)
+
+        m_tag = f"measure_{measure_id}"
+        all_tags = ("measurement", m_tag)
+        items = {"outline": [], "polygon": [], "arc": [], "point": [], "text": [], "text_bg": []}
+
+        def add_points(points):
+            for x, y in points:
+                items["point"].append(self.canvas.create_oval(x-3, y-3, x+3, y+3, fill=style["point"],
+                                                              outline=style["point"], tags=all_tags))
+
+        def add_text(x, y):
+            bg_id, text_id = self.draw_measure_text(x, y, display_text, style["text"], all_tags, highlight=is_selected)
+            if bg_id is not None:
+                items["text_bg"].append(bg_id)
+            if text_id is not None:
+                items["text"].append(text_id)
+
+        # --- Draw based on type ---
+        if measure_type == "distance" and len(scaled_points) == 2:
+            x1, y1 = scaled_points[0]; x2, y2 = scaled_points[1]
+            add_points(scaled_points)
+            items["outline"].append(self.canvas.create_line(x1, y1, x2, y2, fill=style["draw"],
+                                                            width=style["width"], tags=all_tags))
+            add_text((x1 + x2) / 2, (y1 + y2) / 2)
+
+        elif measure_type == "surface" and len(scaled_points) >= 3:
+            flat_points = [coord for point in scaled_points for coord in point]
+            try:
+                # Couleur du produit (ou couleur par défaut) pour le remplissage, couleur standard pour le contour
+                items["polygon"].append(self.canvas.create_polygon(flat_points,
+                                        fill=style["fill"], outline=style["draw"], width=style["width"],
+                                        stipple=self.get_stipple_pattern(), tags=all_tags))
+            except tk.TclError as e:
+                print(f"Erreur TclError lors du dessin du polygone: {e} - Points: {flat_points}")
+                return
+            add_points(scaled_points)
+            cx = sum(p[0] for p in scaled_points) / len(scaled_points)
+            cy = sum(p[1] for p in scaled_points) / len(scaled_points)
+            add_text(cx, cy)
+
+        elif measure_type == "perimeter" and len(scaled_points) >= 2:
+            flat_perimeter_points = [coord for point in scaled_points for coord in point]
+            if len(scaled_points) > 2:
+                flat_perimeter_points.extend(scaled_points[0])
+            try:
+                items["outline"].append(self.canvas.create_line(flat_perimeter_points, fill=style["draw"],
+                                                                width=style["width"], tags=all_tags))
+            except tk.TclError as e:
+                print(f"Erreur TclError lors du dessin de la polyligne (périmètre): {e} - Points: {flat_perimeter_points}")
+                return
+            add_points(scaled_points)
+            cx = sum(p[0] for p in scaled_points) / len(scaled_points)
+            cy = sum(p[1] for p in scaled_points) / len(scaled_points)
+            add_text(cx, cy)
+
+        elif measure_type == "angle" and len(scaled_points) == 3:
+            p1, p2, p3 = scaled_points
+            try:
+                v1_x, v1_y = p1[0] - p2[0], p1[1] - p2[1]
+                v2_x, v2_y = p3[0] - p2[0], p3[1] - p2[1]
+                start_angle_rad = math.atan2(-v1_y, v1_x)
+                end_angle_rad = math.atan2(-v2_y, v2_x)
+                start_deg = math.degrees(start_angle_rad)
+
+                raw_extent = math.degrees(end_angle_rad - start_angle_rad)
+                while raw_extent > 180: raw_extent -= 360
+                while raw_extent <= -180: raw_extent += 360
+                extent_deg = raw_extent
+
+                add_points(scaled_points)
+                items["outline"].append(self.canvas.create_line(p1[0], p1[1], p2[0], p2[1], fill=style["draw"],
+                                                                width=style["width"], tags=all_tags))
+                items["outline"].append(self.canvas.create_line(p2[0], p2[1], p3[0], p3[1], fill=style["draw"],
+                                                                width=style["width"], tags=all_tags))
+                arc_radius = 20
+                arc_bbox = (p2[0] - arc_radius, p2[1] - arc_radius, p2[0] + arc_radius, p2[1] + arc_radius)
+                items["arc"].append(self.canvas.create_arc(arc_bbox, start=start_deg, extent=extent_deg, style=tk.ARC,
+                                                           outline=style["draw"], width=style["arc_width"], tags=all_tags))
+                mid_angle_rad = start_angle_rad + math.radians(extent_deg / 2.0)
+                text_offset = arc_radius + 10
+                add_text(p2[0] + text_offset * math.cos(mid_angle_rad), p2[1] - text_offset * math.sin(mid_angle_rad))
+            except Exception as e:
+                print(f"Erreur dessin angle: {e}")
+                if not items["point"]:
+                    add_points(scaled_points)
+        else:
+            return
+
+        self.measure_items[measure_id] = items
+
+    def add_measure_overlay(self, measure):
+        """Ajoute une mesure à la couche de mesures, si elle est sur la page courante et dans la zone
+           matérialisée (overlay_rect); les autres seront dessinées par update_overlay_culling."""
+        if not self.pdf_document or measure.get("page") != self.current_page:
+            return
+        self.remove_measure_overlay(measure.get("id"))
+        if self.overlay_rect is not None:
+            bbox = measure_bbox(measure.get("points", []))
+            qx0, qy0, qx1, qy1 = self.get_overlay_query_rect(self.overlay_rect)
+            if bbox is None or bbox[0] > qx1 or bbox[2] < qx0 or bbox[1] > qy1 or bbox[3] < qy0:
+                return # Outside the materialized area (same test as the measure index query)
+        self.draw_measure(measure)
+
+    def remove_measure_overlay(self, measure_id):
+        """Retire du canvas les éléments d'une mesure."""
+        self.measure_items.pop(measure_id, None)
+        self.canvas.delete(f"measure_{measure_id}")
+
+    def refresh_measure_overlay(self, measure):
+        """Redessine une seule mesure (texte ou couleur modifiés) en conservant son ordre d'affichage."""
+        measure_id = measure.get("id")
+        if measure_id not in self.measure_items:
+            self.add_measure_overlay(measure)
+            return
+        m_tag = f"measure_{measure_id}"
+        self.canvas.addtag_withtag("measure_refresh_anchor", m_tag) # Remember the stacking position
+        self.measure_items.pop(measure_id, None)
+        self.canvas.dtag(m_tag, m_tag)
+        self.draw_measure(measure)
+        if measure_id in self.measure_items:
+            self.canvas.tag_lower(m_tag, "measure_refresh_anchor")
+        self.canvas.delete("measure_refresh_anchor")
+
+    def set_measure_highlight(self, measure_id, is_selected):
+        """Applique ou retire la surbrillance d'une mesure en modifiant ses éléments (itemconfig)."""
+        items = self.measure_items.get(measure_id)
+        if items is None:
+            return
+        measure = self.measures.get(measure_id)
+        if measure is None:
+            return
+        style = self.get_measure_style(measure, is_selected)
+        for item_id in items["outline"]:
+            self.canvas.itemconfig(item_id, fill=style["draw"], width=style["width"])
+        for item_id in items["polygon"]:
+            self.canvas.itemconfig(item_id, outline=style["draw"], width=style["width"])
+        for item_id in items["arc"]:
+            self.canvas.itemconfig(item_id, outline=style["draw"], width=style["arc_width"])
+        for item_id in items["point"]:
+            self.canvas.itemconfig(item_id, fill=style["point"], outline=style["point"])
+        for item_id in items["text"]:
+            self.canvas.itemconfig(item_id, fill=style["text"])
+        for item_id in items["text_bg"]:
+            self.canvas.itemconfig(item_id, fill=style["text_bg"])
 
     def draw_measure_text(self, x, y, text, color, tags, highlight=False): # Ajout du paramètre highlight
-         """Helper function to draw measurement text with a background."""
+         """Helper function to draw measurement text with a background. Returns (bg_id, text_id).
+            The text size comes from the extent cache, so background and text are created in one pass."""
+         bg_id = text_id = None
          try:
              # Utiliser une couleur de fond différente si surligné
              bg_fill_color = "yellow" if highlight else "white"
-             text_font = ("Arial", 9, "bold")
-
-             # Estimate text bounding box to create background rectangle
-             temp_text_id = self.canvas.create_text(x, y, text=text, fill=color,
-                                                    font=text_font, anchor=tk.CENTER, tags=("temp_text",))
-             bbox = self.canvas.bbox(temp_text_id)
-             if bbox:
-                  pad = 2
-                  # Appliquer la couleur de fond calculée
-                  bg_id = self.canvas.create_rectangle(bbox[0]-pad, bbox[1]-pad, bbox[2]+pad, bbox[3]+pad,
-                                                 fill=bg_fill_color, outline="", tags=tags + ("text_bg",))
-                  # Raise background slightly above image but below text? Maybe not needed.
-                  # self.canvas.tag_raise(bg_id, "page_image")
-             else:
-                 bg_id = None # No background if bbox failed
-             self.canvas.delete(temp_text_id) # Delete temporary text item
 
-             # Dessiner le texte réel par-dessus
+             # Background rectangle around the centered text, from the cached extent
+             width, height = self.label_extents.measure(text)
+             pad = 2
+             half_w = width / 2 + pad
+             half_h = height / 2 + pad
+             bg_id = self.canvas.create_rectangle(x - half_w, y - half_h, x + half_w, y + half_h,
+                                                  fill=bg_fill_color, outline="", tags=tags + ("text_bg",))
+
+             # Dessiner le texte par-dessus
              text_id = self.canvas.create_text(x, y, text=text, fill=color,
-                                         font=text_font, anchor=tk.CENTER, tags=tags + ("text_fg",))
-             # Raise text above background if created
-             # if bg_id:
-             #    self.canvas.tag_raise(text_id, bg_id)
+                                         font=self.label_font, anchor=tk.CENTER, tags=tags + ("text_fg",))
 
          except tk.TclError as e:
               print(f"Erreur TclError lors du dessin du texte de mesure: {e} - Texte: {text}")
          except Exception as e:
               print(f"Erreur inattendue lors du dessin du texte de mesure: {e} - Texte: {text}")
+         return bg_id, text_id
 
 
     # --- Snapping & Ortho ---
 
+    def get_page_intersections(self, page_index):
+        """Retourne l'index des intersections de lignes d'une page, ou None tant qu'elles ne sont pas calculées
+           (le calcul est alors demandé en arrière-plan; il n'a jamais lieu sur le thread Tk)."""
+        intersections = self.intersections_by_page.get(page_index)
+        if isinstance(intersections, np.ndarray): # Points from a worker or the disk cache, indexed on first use
+            intersections = PointGridIndex(intersections)
+            self.intersections_by_page[page_index] = intersections
+        if intersections is None:
+            self.request_page_intersections(page_index)
+        return intersections
+
+    def request_page_intersections(self, page_index):
+        """Demande le calcul des intersections d'une page au thread de géométrie (si ses lignes sont extraites)."""
+        key = ("intersections", page_index)
+        page_lines = self.lines_by_page.get(page_index)
+        if page_lines is None or key in self.geometry_futures or page_index in self.intersections_by_page:
+            return
+        self.geometry_futures[key] = self.get_geometry_executor().submit(
+            compute_page_intersections, page_lines, self.line_index_by_page.get(page_index))
+        self.schedule_geometry_poll()
+
+    def get_geometry_executor(self):
+        """Retourne le thread de géométrie (créé à la première utilisation). Un thread suffit: la lecture
+           du fichier, le hash et les lots NumPy libèrent le GIL."""
+        if self.geometry_executor is None:
+            self.geometry_executor = ThreadPoolExecutor(max_workers=1)
+        return self.geometry_executor
+
+    def schedule_geometry_poll(self):
+        if self._geometry_poll_job is None:
+            self._geometry_poll_job = self.root.after(50, self._poll_geometry_jobs)
+
+    def _poll_geometry_jobs(self):
+        """Récupère sur le thread Tk les calculs de géométrie terminés."""
+        self._geometry_poll_job = None
+        for key, future in list(self.geometry_futures.items()):
+            if not future.done():
+                continue
+            del self.geometry_futures[key]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Avertissement: Échec du calcul {key}: {e}")
+                if key[0] == "cache" and key[1] == self.pdf_path and self.pdf_document:
+                    self.apply_geometry_cache(None, {}) # Without disk cache: everything is extracted
+                continue
+            if key[0] == "cache":
+                if key[1] == self.pdf_path and self.pdf_document:
+                    self.apply_geometry_cache(*result)
+            elif key[0] == "intersections":
+                page_index = key[1]
+                self.intersections_by_page[page_index] = result
+                if self.geometry_cache is not None:
+                    self.geometry_cache.save_intersections(page_index, result)
+                if page_index == self.current_page:
+                    self.invalidate_snap_cache() # Earlier results were computed without these intersections
+                print(f"Intersections page {page_index + 1}: {len(result)} points calculés en arrière-plan.")
+        if self.geometry_futures:
+            self.schedule_geometry_poll()
+
+    def shutdown_geometry_executor(self):
+        """Arrête le thread de géométrie (les calculs en attente sont abandonnés)."""
+        for future in self.geometry_futures.values():
+            future.cancel()
+        self.geometry_futures = {}
+        if self._geometry_poll_job is not None:
+            self.root.after_cancel(self._geometry_poll_job)
+            self._geometry_poll_job = None
+        if self.geometry_executor is not None:
+            self.geometry_executor.shutdown(wait=False) # Pending futures were cancelled above (cancel_futures needs Python 3.9)
+            self.geometry_executor = None
+
+    def snap_cache_key(self, x_canvas, y_canvas, threshold):
+        """Clé du cache d'accrochage: page, position canvas arrondie au pixel, zoom, seuil et options d'accrochage."""
+        return (self.current_page, round(x_canvas), round(y_canvas), tile_zoom_key(max(self.zoom_factor, 1.0) * 1.5),
+                threshold, self.snap_to_endpoints.get(), self.snap_to_midpoints.get(), self.snap_to_intersections.get(),
+                self.snap_to_arcs.get(), self.snap_to_measures.get())
+
+    def invalidate_snap_cache(self):
+        """Vide le cache d'accrochage (lignes, intersections, mesures ou zoom modifiés)."""
+        self.snap_cache.clear()
+
     def find_closest_line_point(self, x_canvas, y_canvas, threshold):
-        """Trouve le point d'accrochage le plus proche (extrémité, milieu, ligne).
-           Prend les coordonnées CANVAS, retourne les coordonnées CANVAS du point d'accrochage."""
-        if not self.pdf_document or self.current_page not in self.lines_by_page:
+        """Trouve le point d'accrochage le plus proche, avec mémorisation du résultat: tant que le curseur
+           reste sur le même pixel, le survol puis le clic ne font qu'une seule recherche.
+           La recherche est faite à la position arrondie au pixel (écart d'au plus un demi-pixel)."""
+        key = self.snap_cache_key(x_canvas, y_canvas, threshold)
+        if key in self.snap_cache:
+            self.snap_cache.move_to_end(key)
+            return self.snap_cache[key]
+        result = self.compute_closest_line_point(key[1], key[2], threshold)
+        if self.current_page in self.lines_by_page: # Not cached while the page lines are pending
+            self.snap_cache[key] = result
+            while len(self.snap_cache) > self.SNAP_CACHE_SIZE:
+                self.snap_cache.popitem(last=False)
+        return result
+
+    def compute_closest_line_point(self, x_canvas, y_canvas, threshold):
+        """Trouve le point d'accrochage le plus proche (extrémité, milieu, intersection, ligne,
+           centre ou quadrant d'arc, sommet ou côté d'une mesure existante).
+           Prend les coordonnées CANVAS, retourne les coordonnées CANVAS du point d'accrochage.
+           Les points caractéristiques (extrémités, milieux, intersections, points d'arcs, sommets) sont prioritaires
+           sur la projection sur une ligne, sinon la ligne gagnerait toujours près d'un point.
+           Les segments d'une courbe aplatie ne comptent que pour la projection.
+           Les mesures restent accrochables pendant l'extraction des lignes de la page."""
+        if not self.pdf_document:
             return None
 
-        closest_snap = None
-        min_dist_sq = threshold**2 # Use squared distance for efficiency
+        closest_point_snap = None
+        min_point_dist_sq = threshold**2 # Use squared distance for efficiency
+        closest_line_snap = None
+        min_line_dist_sq = threshold**2
 
         # Use the same resolution factor as display_page
         display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
         if display_resolution_factor == 0: return None # Avoid division by zero
 
-        # Get lines for the current page (lines are stored in PDF points)
-        lines_on_page = self.lines_by_page.get(self.current_page, [])
-
-        for line in lines_on_page:
-            # Original PDF coordinates
-            (x0_pdf, y0_pdf), (x1_pdf, y1_pdf) = line
-
-            # Convert PDF coordinates to current display coordinates
-            x0_disp, y0_disp = x0_pdf * display_resolution_factor, y0_pdf * display_resolution_factor
-            x1_disp, y1_disp = x1_pdf * display_resolution_factor, y1_pdf * display_resolution_factor
+        # Get lines for the current page (lines are stored in PDF points, array (N, 4))
+        lines_on_page = self.lines_by_page.get(self.current_page, EMPTY_SEGMENTS)
+
+        # Only the segments near the cursor (search radius converted to PDF points) are examined
+        x_cursor_pdf = x_canvas / display_resolution_factor
+        y_cursor_pdf = y_canvas / display_resolution_factor
+        radius_pdf = threshold / display_resolution_factor
+        if self.current_page in self.lines_by_page:
+            # Lines already extracted: at most the grid index is built here, never get_drawings
+            line_index = self.get_page_line_index(self.current_page)
+            candidate_indices = line_index.query(x_cursor_pdf, y_cursor_pdf, radius_pdf)
+        else:
+            candidate_indices = () # Page lines still being extracted: only the measures can be snapped to
+
+        if len(candidate_indices):
+            # Candidates in PDF coordinates and converted to current display coordinates
+            cand_pdf = lines_on_page[candidate_indices].astype(np.float64)
+            cand_disp = cand_pdf * display_resolution_factor
+            x0_disp, y0_disp, x1_disp, y1_disp = cand_disp[:, 0], cand_disp[:, 1], cand_disp[:, 2], cand_disp[:, 3]
+            # Pieces of flattened curves (stored after the straight segments) have no endpoint or midpoint of their own
+            curves = self.get_page_curves(self.current_page)
+            straight = np.asarray(candidate_indices) < (curves["start"] if curves else len(lines_on_page))
+            straight_pdf, straight_disp = cand_pdf[straight], cand_disp[straight]
 
             # --- Check Endpoints ---
-            if self.snap_to_endpoints.get():
-                dist_sq_e1 = (x_canvas - x0_disp)**2 + (y_canvas - y0_disp)**2
-                if dist_sq_e1 < min_dist_sq:
-                    min_dist_sq = dist_sq_e1
-                    closest_snap = {"point": (x0_disp, y0_disp), "type": "endpoint", "pdf_point": (x0_pdf, y0_pdf)}
-
-                dist_sq_e2 = (x_canvas - x1_disp)**2 + (y_canvas - y1_disp)**2
-                if dist_sq_e2 < min_dist_sq:
-                    min_dist_sq = dist_sq_e2
-                    closest_snap = {"point": (x1_disp, y1_disp), "type": "endpoint", "pdf_point": (x1_pdf, y1_pdf)}
+            if self.snap_to_endpoints.get() and len(straight_disp):
+                ends_disp = np.concatenate((straight_disp[:, 0:2], straight_disp[:, 2:4]))
+                dist_sq_ends = (x_canvas - ends_disp[:, 0])**2 + (y_canvas - ends_disp[:, 1])**2
+                best = int(np.argmin(dist_sq_ends))
+                if dist_sq_ends[best] < min_point_dist_sq:
+                    min_point_dist_sq = float(dist_sq_ends[best])
+                    ends_pdf = np.concatenate((straight_pdf[:, 0:2], straight_pdf[:, 2:4]))
+                    closest_point_snap = {"point": tuple(ends_disp[best].tolist()), "type": "endpoint",
+                                          "pdf_point": tuple(ends_pdf[best].tolist())}
 
             # --- Check Midpoint ---
-            if self.snap_to_midpoints.get():
-                mid_x_disp = (x0_disp + x1_disp) / 2
-                mid_y_disp = (y0_disp + y1_disp) / 2
+            if self.snap_to_midpoints.get() and len(straight_disp):
+                mid_x_disp = (straight_disp[:, 0] + straight_disp[:, 2]) / 2
+                mid_y_disp = (straight_disp[:, 1] + straight_disp[:, 3]) / 2
                 dist_sq_mid = (x_canvas - mid_x_disp)**2 + (y_canvas - mid_y_disp)**2
-                if dist_sq_mid < min_dist_sq:
-                    min_dist_sq = dist_sq_mid
-                    mid_x_pdf = (x0_pdf + x1_pdf) / 2
-                    mid_y_pdf = (y0_pdf + y1_pdf) / 2
-                    closest_snap = {"point": (mid_x_disp, mid_y_disp), "type": "midpoint", "pdf_point": (mid_x_pdf, mid_y_pdf)}
+                best = int(np.argmin(dist_sq_mid))
+                if dist_sq_mid[best] < min_point_dist_sq:
+                    min_point_dist_sq = float(dist_sq_mid[best])
+                    mid_pdf = (straight_pdf[best, 0:2] + straight_pdf[best, 2:4]) / 2
+                    closest_point_snap = {"point": (float(mid_x_disp[best]), float(mid_y_disp[best])), "type": "midpoint",
+                                          "pdf_point": tuple(mid_pdf.tolist())}
 
             # --- Check Line Projection (Perpendicular) ---
             dx_disp, dy_disp = x1_disp - x0_disp, y1_disp - y0_disp
             line_len_sq_disp = dx_disp*dx_disp + dy_disp*dy_disp
-
-            if line_len_sq_disp > 1e-6: # Avoid division by zero for zero-length lines
-                # Project point onto the line (using display coordinates)
-                t = ((x_canvas - x0_disp) * dx_disp + (y_canvas - y0_disp) * dy_disp) / line_len_sq_disp
-
-                # If projection is within the line segment (0 <= t <= 1)
-                if 0 <= t <= 1:
-                    proj_x_disp = x0_disp + t * dx_disp
-                    proj_y_disp = y0_disp + t * dy_disp
-                    dist_sq_proj = (x_canvas - proj_x_disp)**2 + (y_canvas - proj_y_disp)**2
-
-                    if dist_sq_proj < min_dist_sq:
-                        min_dist_sq = dist_sq_proj
-                        # Calculate corresponding PDF point
-                        dx_pdf, dy_pdf = x1_pdf - x0_pdf, y1_pdf - y0_pdf
-                        proj_x_pdf = x0_pdf + t * dx_pdf
-                        proj_y_pdf = y0_pdf + t * dy_pdf
-                        closest_snap = {"point": (proj_x_disp, proj_y_disp), "type": "line", "pdf_point": (proj_x_pdf, proj_y_pdf)}
-
-        # TODO: Add Intersection Snapping (more complex)
-
-        return closest_snap
+            valid = line_len_sq_disp > 1e-6 # Avoid division by zero for zero-length lines
+            # Project point onto the lines (using display coordinates)
+            t = ((x_canvas - x0_disp) * dx_disp + (y_canvas - y0_disp) * dy_disp) / np.where(valid, line_len_sq_disp, 1.0)
+            # Curve pieces are clamped to their ends, so the joints between pieces stay snappable
+            t = np.where(straight, t, np.clip(t, 0.0, 1.0))
+            # Only projections within the line segment (0 <= t <= 1)
+            valid &= (t >= 0) & (t <= 1)
+            if valid.any():
+                proj_x_disp = x0_disp + t * dx_disp
+                proj_y_disp = y0_disp + t * dy_disp
+                dist_sq_proj = np.where(valid, (x_canvas - proj_x_disp)**2 + (y_canvas - proj_y_disp)**2, np.inf)
+                best = int(np.argmin(dist_sq_proj))
+                if dist_sq_proj[best] < min_line_dist_sq:
+                    min_line_dist_sq = float(dist_sq_proj[best])
+                    # Calculate corresponding PDF point
+                    x0_pdf, y0_pdf, x1_pdf, y1_pdf = cand_pdf[best].tolist()
+                    t_best = float(t[best])
+                    proj_x_pdf = x0_pdf + t_best * (x1_pdf - x0_pdf)
+                    proj_y_pdf = y0_pdf + t_best * (y1_pdf - y0_pdf)
+                    closest_line_snap = {"point": (float(proj_x_disp[best]), float(proj_y_disp[best])), "type": "line",
+                                         "pdf_point": (proj_x_pdf, proj_y_pdf)}
+
+        # --- Check Intersections (precomputed per page) ---
+        if self.snap_to_intersections.get() and self.current_page in self.lines_by_page:
+            intersections = self.get_page_intersections(self.current_page)
+            if intersections is not None and len(intersections):
+                near = intersections.query(x_cursor_pdf, y_cursor_pdf, radius_pdf)
+                if len(near):
+                    inter_pdf = intersections.points[near]
+                    inter_disp = inter_pdf * display_resolution_factor
+                    dist_sq_inter = (x_canvas - inter_disp[:, 0])**2 + (y_canvas - inter_disp[:, 1])**2
+                    best = int(np.argmin(dist_sq_inter))
+                    if dist_sq_inter[best] < min_point_dist_sq:
+                        min_point_dist_sq = float(dist_sq_inter[best])
+                        closest_point_snap = {"point": tuple(inter_disp[best].tolist()), "type": "intersection",
+                                              "pdf_point": tuple(inter_pdf[best].tolist())}
+
+        # --- Check Curve Points (arc centres and quadrants, curve ends) ---
+        curves = self.get_page_curves(self.current_page)
+        if curves is not None and len(curves["points"]) and (self.snap_to_arcs.get() or self.snap_to_endpoints.get()):
+            near = curves["index"].query(x_cursor_pdf, y_cursor_pdf, radius_pdf)
+            if len(near):
+                is_end = curves["kinds"][near] == CURVE_POINT_END
+                near = near[np.where(is_end, self.snap_to_endpoints.get(), self.snap_to_arcs.get())]
+            if len(near):
+                curve_pdf = curves["points"][near].astype(np.float64)
+                curve_disp = curve_pdf * display_resolution_factor
+                dist_sq_curve = (x_canvas - curve_disp[:, 0])**2 + (y_canvas - curve_disp[:, 1])**2
+                best = int(np.argmin(dist_sq_curve))
+                if dist_sq_curve[best] < min_point_dist_sq:
+                    min_point_dist_sq = float(dist_sq_curve[best])
+                    closest_point_snap = {"point": tuple(curve_disp[best].tolist()),
+                                          "type": CURVE_POINT_TYPES[int(curves["kinds"][near[best]])],
+                                          "pdf_point": tuple(curve_pdf[best].tolist())}
+
+        # --- Check Existing Measurements (vertices, then edges) ---
+        if self.snap_to_measures.get():
+            measure_index = self.get_measure_index(self.current_page)
+            near_ids = measure_index.query_rect(x_cursor_pdf - radius_pdf, y_cursor_pdf - radius_pdf,
+                                                x_cursor_pdf + radius_pdf, y_cursor_pdf + radius_pdf)
+            vertex_arrays, edge_arrays = [], []
+            for measure_id in near_ids:
+                measure = measure_index.get(measure_id)
+                points = measure.get("points", []) if measure else []
+                if not points:
+                    continue
+                vertices = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+                vertex_arrays.append(vertices)
+                if len(vertices) >= 2:
+                    if measure.get("type") in ("surface", "perimeter") and len(vertices) > 2:
+                        vertices = np.vstack([vertices, vertices[:1]]) # Closing edge
+                    edge_arrays.append(np.hstack([vertices[:-1], vertices[1:]]))
+
+            if vertex_arrays:
+                vert_pdf = np.vstack(vertex_arrays)
+                vert_disp = vert_pdf * display_resolution_factor
+                dist_sq_vert = (x_canvas - vert_disp[:, 0])**2 + (y_canvas - vert_disp[:, 1])**2
+                best = int(np.argmin(dist_sq_vert))
+                if dist_sq_vert[best] < min_point_dist_sq:
+                    min_point_dist_sq = float(dist_sq_vert[best])
+                    closest_point_snap = {"point": tuple(vert_disp[best].tolist()), "type": "measure_vertex",
+                                          "pdf_point": tuple(vert_pdf[best].tolist())}
+
+            if edge_arrays:
+                edge_pdf = np.vstack(edge_arrays)
+                ex0, ey0, ex1, ey1 = (edge_pdf[:, k] * display_resolution_factor for k in range(4))
+                dx, dy = ex1 - ex0, ey1 - ey0
+                len_sq = dx**2 + dy**2
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    t = ((x_canvas - ex0) * dx + (y_canvas - ey0) * dy) / len_sq
+                t = np.clip(np.where(len_sq > 1e-12, t, 0.0), 0.0, 1.0)
+                proj_x, proj_y = ex0 + t * dx, ey0 + t * dy
+                dist_sq_edge = (x_canvas - proj_x)**2 + (y_canvas - proj_y)**2
+                best = int(np.argmin(dist_sq_edge))
+                if dist_sq_edge[best] < min_line_dist_sq:
+                    min_line_dist_sq = float(dist_sq_edge[best])
+                    t_best = float(t[best])
+                    x0_pdf, y0_pdf, x1_pdf, y1_pdf = edge_pdf[best].tolist()
+                    closest_line_snap = {"point": (float(proj_x[best]), float(proj_y[best])), "type": "measure_edge",
+                                         "pdf_point": (x0_pdf + t_best * (x1_pdf - x0_pdf), y0_pdf + t_best * (y1_pdf - y0_pdf))}
+
+        return closest_point_snap or closest_line_snap
 
 
     def on_canvas_move(self, event):
-        """Gestion des mouvements de souris sur le canvas avec snapping et mode ortho."""
+        """Gestion des mouvements de souris sur le canvas: seule la dernière position est conservée,
+           et elle est traitée au plus une fois par image (MOTION_FRAME_MS)."""
         if not self.pdf_document or self.panning: # Don't process during pan
             return
-
+        self._pending_motion = (event.x, event.y)
+        if self._motion_job is None:
+            self._motion_job = self.root.after(self.MOTION_FRAME_MS, self._process_pending_motion)
+
+    def _process_pending_motion(self):
+        """Traite la dernière position de souris reçue (snapping, mode ortho, repères, barre de statut)."""
+        self._motion_job = None
+        pending, self._pending_motion = self._pending_motion, None
+        if pending is None or not self.pdf_document or self.panning:
+            return
+        self.update_pointer_feedback(*pending)
+
+    def set_motion_item(self, name, kind, coords, tags, **options):
+        """Affiche un élément de retour visuel du curseur en réutilisant l'élément existant
+           (déplacé avec coords) au lieu de le supprimer et le recréer à chaque mouvement."""
+        item_id = self.motion_items.get(name)
+        if item_id is not None and self.canvas.type(item_id):
+            self.canvas.coords(item_id, *coords)
+            if self.motion_item_options.get(name) != options:
+                self.canvas.itemconfig(item_id, **options)
+                self.motion_item_options[name] = options
+            return item_id
+        create = getattr(self.canvas, f"create_{kind}")
+        item_id = create(*coords, tags=tags, **options)
+        self.motion_items[name] = item_id
+        self.motion_item_options[name] = options
+        return item_id
+
+    def clear_motion_items(self, keep=()):
+        """Supprime les éléments de retour visuel du curseur non utilisés dans l'image courante."""
+        for name in [n for n in self.motion_items if n not in keep]:
+            self.canvas.delete(self.motion_items.pop(name))
+            self.motion_item_options.pop(name, None)
+
+    def update_pointer_feedback(self, screen_x, screen_y):
+        """Calcule le point d'accrochage / ortho pour la position écran donnée et met à jour
+           les repères, la ligne élastique de la mesure en cours et la barre de statut."""
         # Get raw canvas coordinates from event
-        x_canvas, y_canvas = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        x_canvas, y_canvas = self.canvas.canvasx(screen_x), self.canvas.canvasy(screen_y)
+        display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
 
         # --- Determine Final Point (Snapping/Ortho) ---
         # This final point is in CANVAS coordinates for drawing temporary lines/indicators
@@ -3350,7 +5464,6 @@ class MetrePDFApp:
         # Ortho snaps relative to the LAST PLACED POINT (in display coords)
         if self.ortho_mode and not snap_applied_type and self.points:
             last_x_pdf, last_y_pdf = self.points[-1] # Last recorded PDF point
-            display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
             last_x_disp, last_y_disp = last_x_pdf * display_resolution_factor, last_y_pdf * display_resolution_factor
 
             dx = abs(x_canvas - last_x_disp) # Use raw canvas coords for ortho calculation
@@ -3362,51 +5475,93 @@ class MetrePDFApp:
                 final_x_disp = last_x_disp
             ortho_applied = True
 
-        # --- Draw Indicators ---
-        self.canvas.delete("snap_indicator")
-        self.canvas.delete("ortho_indicator")
-        self.canvas.delete("temp_line")
-        self.canvas.delete("temp_angle")
+        # --- Draw Indicators (existing items are moved, not recreated) ---
+        used = set()
+        fx, fy = final_x_disp, final_y_disp
 
         if snap_applied_type:
              # Afficher un repère visuel pour le snap
-             snap_color = "cyan" # Default for line
              snap_size = 4
              if snap_applied_type == "endpoint":
-                  snap_color = "lime" # Green for endpoint
-                  self.canvas.create_rectangle(final_x_disp - snap_size, final_y_disp - snap_size,
-                                              final_x_disp + snap_size, final_y_disp + snap_size,
-                                              outline=snap_color, tags="snap_indicator")
+                  self.set_motion_item("snap_endpoint", "rectangle",
+                                       (fx - snap_size, fy - snap_size, fx + snap_size, fy + snap_size),
+                                       "snap_indicator", outline="lime") # Green for endpoint
+                  used.add("snap_endpoint")
              elif snap_applied_type == "midpoint":
-                  snap_color = "magenta" # Magenta for midpoint
-                  self.canvas.create_polygon(final_x_disp, final_y_disp - snap_size,
-                                             final_x_disp - snap_size, final_y_disp + snap_size,
-                                             final_x_disp + snap_size, final_y_disp + snap_size,
-                                             outline=snap_color, fill="", tags="snap_indicator")
+                  self.set_motion_item("snap_midpoint", "polygon",
+                                       (fx, fy - snap_size, fx - snap_size, fy + snap_size, fx + snap_size, fy + snap_size),
+                                       "snap_indicator", outline="magenta", fill="") # Magenta for midpoint
+                  used.add("snap_midpoint")
+             elif snap_applied_type == "intersection":
+                  # Yellow X for intersection
+                  self.set_motion_item("snap_x1", "line", (fx - snap_size, fy - snap_size, fx + snap_size, fy + snap_size),
+                                       "snap_indicator", fill="yellow", width=2)
+                  self.set_motion_item("snap_x2", "line", (fx - snap_size, fy + snap_size, fx + snap_size, fy - snap_size),
+                                       "snap_indicator", fill="yellow", width=2)
+                  used.update(("snap_x1", "snap_x2"))
+             elif snap_applied_type == "arc_center":
+                  self.set_motion_item("snap_arc_center", "oval",
+                                       (fx - snap_size, fy - snap_size, fx + snap_size, fy + snap_size),
+                                       "snap_indicator", outline="deep sky blue", width=2) # Blue circle for arc centre
+                  used.add("snap_arc_center")
+             elif snap_applied_type == "arc_quadrant":
+                  self.set_motion_item("snap_arc_quadrant", "polygon",
+                                       (fx, fy - snap_size, fx + snap_size, fy, fx, fy + snap_size, fx - snap_size, fy),
+                                       "snap_indicator", outline="deep sky blue", fill="", width=2) # Blue diamond for quadrant
+                  used.add("snap_arc_quadrant")
+             elif snap_applied_type == "measure_vertex":
+                  self.set_motion_item("snap_measure_vertex", "rectangle",
+                                       (fx - snap_size, fy - snap_size, fx + snap_size, fy + snap_size),
+                                       "snap_indicator", outline="#FF8C00", width=2) # Orange for measure vertex
+                  used.add("snap_measure_vertex")
+             elif snap_applied_type == "measure_edge":
+                  self.set_motion_item("snap_edge_h", "line", (fx - snap_size, fy, fx + snap_size, fy),
+                                       "snap_indicator", fill="#FF8C00", width=2)
+                  self.set_motion_item("snap_edge_v", "line", (fx, fy - snap_size, fx, fy + snap_size),
+                                       "snap_indicator", fill="#FF8C00", width=2)
+                  used.update(("snap_edge_h", "snap_edge_v"))
              else: # Line snap
-                 self.canvas.create_line(final_x_disp - snap_size, final_y_disp, final_x_disp + snap_size, final_y_disp, fill=snap_color, width=1, tags="snap_indicator")
-                 self.canvas.create_line(final_x_disp, final_y_disp - snap_size, final_x_disp, final_y_disp + snap_size, fill=snap_color, width=1, tags="snap_indicator")
+                  self.set_motion_item("snap_h", "line", (fx - snap_size, fy, fx + snap_size, fy),
+                                       "snap_indicator", fill="cyan", width=1)
+                  self.set_motion_item("snap_v", "line", (fx, fy - snap_size, fx, fy + snap_size),
+                                       "snap_indicator", fill="cyan", width=1)
+                  used.update(("snap_h", "snap_v"))
 
         elif ortho_applied and self.points: # Draw ortho indicator only if applied
             last_x_pdf, last_y_pdf = self.points[-1]
-            display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
             last_x_disp, last_y_disp = last_x_pdf * display_resolution_factor, last_y_pdf * display_resolution_factor
-            self.canvas.create_line(last_x_disp, last_y_disp, final_x_disp, final_y_disp,
-                                   fill="orange", width=1, dash=(3, 3), tags="ortho_indicator")
-            self.canvas.create_rectangle(final_x_disp-2, final_y_disp-2, final_x_disp+2, final_y_disp+2, outline="orange", tags="ortho_indicator")
-
+            self.set_motion_item("ortho_line", "line", (last_x_disp, last_y_disp, fx, fy),
+                                 "ortho_indicator", fill="orange", width=1, dash=(3, 3))
+            self.set_motion_item("ortho_box", "rectangle", (fx - 2, fy - 2, fx + 2, fy + 2),
+                                 "ortho_indicator", outline="orange")
+            used.update(("ortho_line", "ortho_box"))
+
+
+        # --- Hover highlight of an existing measure (only between measurements) ---
+        hovered = None
+        if not self.points and self.mode != "calibration":
+            hovered = self.find_measure_at(x_canvas, y_canvas)
+        self.hovered_measure_id = hovered.get("id") if hovered else None
+        if hovered:
+            hover_points = [(p[0] * display_resolution_factor, p[1] * display_resolution_factor) for p in hovered.get("points", [])]
+            if hovered.get("type") in ("surface", "perimeter") and len(hover_points) > 2:
+                hover_points.append(hover_points[0])
+            if len(hover_points) >= 2:
+                self.set_motion_item("hover_outline", "line", [c for p in hover_points for c in p],
+                                     "hover_indicator", fill="#00BFFF", width=4)
+                if self.hovered_measure_id in self.measure_items: # Halo under the measure's own items
+                    self.canvas.tag_lower(self.motion_items["hover_outline"], f"measure_{self.hovered_measure_id}")
+                used.add("hover_outline")
 
         # --- Update Status Bar ---
         status_text = f"X: {final_x_disp:.1f}, Y: {final_y_disp:.1f} (Disp)"
         if self.absolute_scale:
              # Convert final display coords back to PDF coords, then to real units
-             display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
              if display_resolution_factor > 1e-6:
                   final_x_pdf = final_x_disp / display_resolution_factor
                   final_y_pdf = final_y_disp / display_resolution_factor
-                  real_x = final_x_pdf * self.absolute_scale # Assumes scale is meters/PDF point
-                  real_y = final_y_pdf * self.absolute_scale # Need to define absolute_scale correctly
-                  # Let's define absolute_scale as meters / PDF point
+                  real_x = final_x_pdf * self.absolute_scale # absolute_scale is meters / PDF point
+                  real_y = final_y_pdf * self.absolute_scale
                   unit = self.unit_var.get()
                   display_val_x, display_unit_x = self.convert_units(real_x, unit)
                   display_val_y, display_unit_y = self.convert_units(real_y, unit)
@@ -3418,13 +5573,16 @@ class MetrePDFApp:
             status_text += f" | Accroché ({snap_applied_type})"
         elif ortho_applied:
             status_text += " | Mode Ortho [Shift]"
+        elif self.enable_snapping.get() and not self.is_page_lines_ready(self.current_page):
+            status_text += " | Accrochage: extraction des lignes en cours..."
+        if hovered:
+            status_text += f" | Mesure: {hovered.get('display_text', '')} (Ctrl+clic pour sélectionner)"
         self.status_bar.config(text=status_text)
 
 
         # --- Draw Temporary Measurement Visuals ---
         if self.points: # Only draw temp lines if a measurement is in progress
             last_x_pdf, last_y_pdf = self.points[-1]
-            display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
             last_x_disp, last_y_disp = last_x_pdf * display_resolution_factor, last_y_pdf * display_resolution_factor
 
             # Draw line from last placed point to current cursor position (final_x_disp, final_y_disp)
@@ -3435,15 +5593,17 @@ class MetrePDFApp:
             elif self.mode == "angle": temp_line_color = self.angle_color.get()
 
             if self.mode != "angle" or len(self.points) == 1: # Draw simple temp line
-                 self.canvas.create_line(last_x_disp, last_y_disp, final_x_disp, final_y_disp,
-                                        dash=(4, 4), fill=temp_line_color, tags="temp_line")
+                 self.set_motion_item("temp_line", "line", (last_x_disp, last_y_disp, fx, fy),
+                                      "temp_line", dash=(4, 4), fill=temp_line_color)
+                 used.add("temp_line")
 
             # For Surface/Perimeter, also draw closing line preview if needed
             if self.mode in ["surface", "perimeter"] and len(self.points) > 1:
                  first_x_pdf, first_y_pdf = self.points[0]
                  first_x_disp, first_y_disp = first_x_pdf * display_resolution_factor, first_y_pdf * display_resolution_factor
-                 self.canvas.create_line(first_x_disp, first_y_disp, final_x_disp, final_y_disp,
-                                        dash=(2, 2), fill=temp_line_color, tags="temp_line")
+                 self.set_motion_item("temp_closing_line", "line", (first_x_disp, first_y_disp, fx, fy),
+                                      "temp_line", dash=(2, 2), fill=temp_line_color)
+                 used.add("temp_closing_line")
 
             # For Angle, draw second arm and arc preview
             if self.mode == "angle" and len(self.points) == 2:
@@ -3453,18 +5613,17 @@ class MetrePDFApp:
                 p1_disp = (p1_pdf[0] * display_resolution_factor, p1_pdf[1] * display_resolution_factor)
 
                 # Draw fixed first arm (dashed)
-                self.canvas.create_line(p1_disp[0], p1_disp[1], vertex_disp[0], vertex_disp[1],
-                                       fill=temp_line_color, width=1, dash=(2,2), tags="temp_angle")
+                self.set_motion_item("temp_angle_arm1", "line", (p1_disp[0], p1_disp[1], vertex_disp[0], vertex_disp[1]),
+                                     "temp_angle", fill=temp_line_color, width=1, dash=(2, 2))
                 # Draw moving second arm
-                self.canvas.create_line(vertex_disp[0], vertex_disp[1], final_x_disp, final_y_disp,
-                                       dash=(4, 4), fill=temp_line_color, tags="temp_angle")
+                self.set_motion_item("temp_angle_arm2", "line", (vertex_disp[0], vertex_disp[1], fx, fy),
+                                     "temp_angle", dash=(4, 4), fill=temp_line_color)
+                used.update(("temp_angle_arm1", "temp_angle_arm2"))
 
                 # Draw temporary arc preview
                 try:
                     # Calculate angle for preview using display coordinates
                     temp_p3_disp = (final_x_disp, final_y_disp)
-                    # Convert display points back to PDF points for calculation consistency?
-                    # Or calculate directly from display points? Let's use display for visual preview.
                     angle_val, start_rad_disp, end_rad_disp = self.calculate_angle_display(p1_disp, vertex_disp, temp_p3_disp)
 
                     start_deg_disp = math.degrees(start_rad_disp)
@@ -3475,17 +5634,20 @@ class MetrePDFApp:
 
                     arc_radius = 20
                     arc_bbox = (vertex_disp[0] - arc_radius, vertex_disp[1] - arc_radius, vertex_disp[0] + arc_radius, vertex_disp[1] + arc_radius)
-                    self.canvas.create_arc(arc_bbox, start=start_deg_disp, extent=extent_deg_disp,
-                                          style=tk.ARC, outline=temp_line_color, width=1, dash=(2,2), tags="temp_angle")
+                    self.set_motion_item("temp_angle_arc", "arc", arc_bbox, "temp_angle", start=start_deg_disp,
+                                         extent=extent_deg_disp, style=tk.ARC, outline=temp_line_color, width=1, dash=(2, 2))
                     # Preview angle value
                     mid_angle_rad_disp = start_rad_disp + math.radians(extent_deg_disp / 2.0)
                     text_offset = arc_radius + 10
                     text_x = vertex_disp[0] + text_offset * math.cos(mid_angle_rad_disp)
                     text_y = vertex_disp[1] - text_offset * math.sin(mid_angle_rad_disp) # Y inverted
-                    self.canvas.create_text(text_x, text_y, text=f"{angle_val:.1f}°", fill=temp_line_color, font=("Arial", 9), tags="temp_angle")
+                    self.set_motion_item("temp_angle_text", "text", (text_x, text_y), "temp_angle",
+                                         text=f"{angle_val:.1f}°", fill=temp_line_color, font=("Arial", 9))
+                    used.update(("temp_angle_arc", "temp_angle_text"))
                 except Exception as e: # Ignore errors during temporary preview calculation
                     print(f"Erreur aperçu angle: {e}")
-                    pass
+
+        self.clear_motion_items(keep=used)
 
 
     def on_canvas_click(self, event):
@@ -3682,9 +5844,6 @@ class MetrePDFApp:
             # Value stored is distance in PDF points
             self.add_measurement("distance", distance_pdf_units, display_text)
 
-            # Redraw handles showing the final measurement
-            self.redraw_measurements()
-
             # Reset for next measurement
             self.points = []
 
@@ -3763,9 +5922,6 @@ class MetrePDFApp:
             # Add the final measurement (value is angle degrees)
             self.add_measurement("angle", angle_deg, display_text)
 
-            # Redraw to show the final angle measurement
-            self.redraw_measurements()
-
             # Reset for next angle
             self.points = []
             self.status_bar.config(text="Mode Angle: Cliquez le premier point")
@@ -3811,6 +5967,7 @@ class MetrePDFApp:
 
             if real_distance_meters is not None and real_distance_meters > 0:
                 # Calculate the ABSOLUTE scale (METERS per PDF point unit)
+                self.journal.record("scale", self.absolute_scale, real_distance_meters / distance_pdf_units)
                 self.absolute_scale = real_distance_meters / distance_pdf_units
 
                 # Update UI display for scale
@@ -3877,9 +6034,6 @@ class MetrePDFApp:
         # Value stored is area in PDF points squared
         self.add_measurement("surface", area_pdf_units_sq, display_text)
 
-        # Redraw to show final measurement
-        self.redraw_measurements()
-
         # Reset for next measurement
         self.points = []
         self.status_bar.config(text="Surface ajoutée. Prêt pour la suivante.")
@@ -3918,9 +6072,6 @@ class MetrePDFApp:
         # Value stored is perimeter in PDF points
         self.add_measurement("perimeter", perimeter_pdf_units, display_text)
 
-        # Redraw to show final measurement
-        self.redraw_measurements()
-
         # Reset for next measurement
         self.points = []
         self.status_bar.config(text="Périmètre ajouté. Prêt pour le suivant.")
@@ -4083,7 +6234,7 @@ class MetrePDFApp:
     def add_measurement(self, measure_type, value, display_text):
         """Ajoute une mesure finalisée à la liste interne et au Treeview."""
         # value is: pdf_points (distance, perimeter), pdf_points^2 (area), degrees (angle)
-        measure_id = time.time() # Use timestamp for a unique-ish ID
+        measure_id = self.measures.allocate_id() # Monotonic integer, also the Treeview iid
 
         measure = {
             "id": measure_id,
@@ -4128,136 +6279,357 @@ class MetrePDFApp:
                         measure["display_text"] += f" [{product}]"
 
 
-        self.measures.append(measure)
-        self.update_measures_list() # Refresh the entire list view
-        self.update_product_totals_display() # <--- AJOUTER CET APPEL
+        measure = MeasureRecord(measure) # Product association included: undone together with the measure
+        self.insert_measures([measure])
+        self.journal.record("add", (measure,))
+
+    def insert_measures(self, measures):
+        """Ajoute des mesures (MeasureRecord) au store, à l'index spatial, au canvas et à la liste,
+           par les chemins incrémentaux (un lot passe par insert_measure_rows, sans reconstruire la liste)."""
+        for measure in measures:
+            self.measures.add(measure)
+            self.get_measure_index(measure["page"]).insert(measure["id"], measure_bbox(measure["points"]), measure)
+            self.add_measure_overlay(measure) # Draw only the new measure on the canvas
+        self.invalidate_snap_cache() # The new vertices and edges can be snapped to
+        if len(measures) == 1:
+            self.insert_measure_row(measures[0]) # Only the new row is added to the list view
+        else:
+            self.insert_measure_rows(measures)
+        self.update_product_totals_display()
+
+    def remove_measures(self, measure_ids):
+        """Retire des mesures du store, de l'index spatial, du canvas et de la liste; retourne les
+           enregistrements retirés (pour le journal d'annulation)."""
+        removed = []
+        for measure_id in measure_ids:
+            measure = self.measures.remove(measure_id)
+            if measure is None:
+                continue
+            removed.append(measure)
+            index = self.measure_index_by_page.get(measure.get("page"))
+            if index is not None:
+                index.remove(measure_id)
+            self.remove_measure_overlay(measure_id) # Remove only the deleted measures from the canvas
+        self.invalidate_snap_cache()
+        # Si la mesure supprimée était celle sélectionnée, désélectionner
+        if self.selected_measure_id in measure_ids:
+            self.selected_measure_id = None
+        self.delete_measure_rows(measure_ids) # Only the deleted rows leave the Treeview
+        self.update_product_totals_display()
+        return removed
 
-    def update_measures_list(self):
-        """Met à jour (recrée) l'affichage dans le Treeview des mesures."""
-        # Store selection
-        selected_iids = self.measures_list.selection()
+    def get_measure_row_values(self, measure):
+        """Valeurs affichées dans le Treeview pour une mesure (type, valeur, produit, page)."""
+        m_type = measure.get("type", "N/A").capitalize()
+        m_page = measure.get("page", -1) + 1
+        m_display = measure.get("display_text", "") # Includes product if associated
 
-        # Clear existing items
-        for item in self.measures_list.get_children():
-            self.measures_list.delete(item)
+        # Extract just the value part for the 'Valeur' column if needed, or show full text
+        value_part = m_display.split(' [')[0] # Get text before product association bracket
+        product_name = measure.get("product_name", "")
+        return (m_type, value_part, product_name, m_page)
 
-        # Re-populate from self.measures
-        for measure in self.measures:
-             measure_id = measure.get("id", "")
-             m_type = measure.get("type", "N/A").capitalize()
-             m_page = measure.get("page", -1) + 1
-             m_display = measure.get("display_text", "") # Includes product if associated
+    def update_measures_list(self):
+        """Reconstruit la liste des mesures en un seul lot (chargement de projet, document fermé):
+           ordre filtré/trié recalculé depuis le store, choix des filtres mis à jour, sélection conservée.
+           Les ajouts, suppressions et modifications passent par insert/delete/update_measure_rows."""
+        self.measure_list_selection = {measure_id for measure_id in self.measure_list_selection if measure_id in self.measures}
+        self.update_measure_list_filters()
+        self.rebuild_measure_list_order()
+
+    def update_measure_list_filters(self):
+        """Met à jour les choix des filtres (pages et produits présents dans les index du store)."""
+        self.measure_page_filter_combo["values"] = ["Toutes"] + [str(page + 1) for page in sorted(
+            page for page in self.measures.by_page if isinstance(page, int))]
+        self.measure_product_filter_combo["values"] = ["Tous", "(aucun)"] + sorted(self.measures.product_names())
+
+    def get_filtered_measures(self):
+        """Mesures retenues par les filtres de page et de produit, lues sur les index du store."""
+        page_filter = self.measure_page_filter.get()
+        product_filter = self.measure_product_filter.get()
+        if product_filter not in ("Tous", "(aucun)"):
+            measures = self.measures.with_product(product_filter)
+            if page_filter != "Toutes":
+                measures = [m for m in measures if m.get("page") == int(page_filter) - 1]
+            return measures
+        measures = self.measures.on_page(int(page_filter) - 1) if page_filter != "Toutes" else self.measures
+        if product_filter == "(aucun)":
+            return [m for m in measures if not m.get("product_name")]
+        return list(measures)
+
+    def get_measure_sort_key(self, column):
+        """Clé de tri d'une colonne de la liste (l'identifiant départage, dans l'ordre de création)."""
+        if column == "type":
+            return lambda m: (m.get("type") or "", m.get("id"))
+        if column == "page":
+            return lambda m: (m.get("page", -1), m.get("id"))
+        if column == "produit":
+            return lambda m: ((m.get("product_name") or "").lower(), m.get("id"))
+        # Values are in pt, pt² or degrees depending on the type: grouped by type, then by value
+        return lambda m: (m.get("type") or "", m.get("value") or 0.0, m.get("id"))
+
+    def rebuild_measure_list_order(self):
+        """Recalcule l'ordre des mesures affichées (filtres puis tri, sur le store) et réaffiche la fenêtre visible."""
+        column, descending = self.measure_list_sort
+        measures = self.get_filtered_measures()
+        if column is not None:
+            measures = sorted(measures, key=self.get_measure_sort_key(column), reverse=descending)
+        self.measure_list_order = [m.get("id") for m in measures]
+        self.measure_list_positions = {measure_id: position for position, measure_id in enumerate(self.measure_list_order)}
+        self.render_measure_list_rows()
+
+    def get_measure_list_position(self, measure_id):
+        """Position d'une mesure dans la liste affichée (filtrée et triée), ou None si elle n'y figure pas."""
+        if self.measure_list_positions is None: # Stale after an insertion inside the list or a deletion
+            self.measure_list_positions = {measure_id: position for position, measure_id in enumerate(self.measure_list_order)}
+        return self.measure_list_positions.get(measure_id)
+
+    def sort_measure_list(self, column):
+        """Trie la liste sur une colonne (un second clic inverse l'ordre), avec une flèche dans l'en-tête."""
+        current_column, descending = self.measure_list_sort
+        descending = not descending if column == current_column else False
+        self.measure_list_sort = (column, descending)
+        for name, text in self.MEASURE_LIST_HEADINGS.items():
+            arrow = (" ▼" if descending else " ▲") if name == column else ""
+            self.measures_list.heading(name, text=text + arrow)
+        self.rebuild_measure_list_order()
+
+    def get_measure_list_visible_rows(self):
+        """Nombre de lignes qui tiennent dans la hauteur actuelle du Treeview (en-tête déduit)."""
+        try:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 25)
+        except (tk.TclError, ValueError):
+            row_height = 25
+        return max(1, self.measures_list.winfo_height() // row_height - 1)
+
+    def render_measure_list_rows(self):
+        """Matérialise dans le Treeview les seules lignes visibles (plus MEASURE_LIST_BUFFER_ROWS),
+           réapplique la sélection et met à jour la barre de défilement (relative à toute la liste)."""
+        total = len(self.measure_list_order)
+        visible_rows = self.get_measure_list_visible_rows()
+        self.measure_list_first = max(0, min(self.measure_list_first, total - visible_rows))
+        window = self.measure_list_order[self.measure_list_first:self.measure_list_first + visible_rows + self.MEASURE_LIST_BUFFER_ROWS]
+
+        children = self.measures_list.get_children()
+        if children:
+            self.measures_list.delete(*children)
+        for measure_id in window:
+            measure = self.measures.get(measure_id)
+            if measure is not None:
+                # Use measure ID as item ID for reliable selection/deletion (ids are unique in the store)
+                self.measures_list.insert("", "end", iid=str(measure_id), values=self.get_measure_row_values(measure))
+        self.measures_list.yview_moveto(0)
+
+        selected_iids = [str(measure_id) for measure_id in window if measure_id in self.measure_list_selection]
+        self.measures_list.selection_set(selected_iids)
+        if selected_iids:
+            self.measures_list.focus(selected_iids[0])
 
-             # Extract just the value part for the 'Valeur' column if needed, or show full text
-             value_part = m_display.split(' [')[0] # Get text before product association bracket
-             product_name = measure.get("product_name", "")
+        self.update_measure_list_scrollbar(visible_rows)
 
-             values_tuple = (m_type, value_part, product_name, m_page)
+    def update_measure_list_scrollbar(self, visible_rows=None):
+        """Met la barre de défilement à la position de la fenêtre dans toute la liste."""
+        total = len(self.measure_list_order)
+        if visible_rows is None:
+            visible_rows = self.get_measure_list_visible_rows()
+        if total:
+            self.measure_list_vsb.set(self.measure_list_first / total, min(1.0, (self.measure_list_first + visible_rows) / total))
+        else:
+            self.measure_list_vsb.set(0.0, 1.0)
 
-             # Use measure ID as item ID for reliable selection/deletion
-             try:
-                 iid_str = str(measure_id)
-                 self.measures_list.insert("", "end", iid=iid_str, values=values_tuple)
-             except tk.TclError as e:
-                 # Handle potential duplicate IDs if timestamps collide (very unlikely)
-                 print(f"Erreur TclError lors de l'insertion mesure dans Treeview: {e} - ID: {measure_id}")
-                 # Try adding a suffix if ID exists
-                 try:
-                      iid_str = f"{measure_id}_{time.time()}" # Add more uniqueness
-                      self.measures_list.insert("", "end", iid=iid_str, values=values_tuple)
-                 except tk.TclError as e2:
-                      print(f"Échec de l'insertion Treeview même avec suffixe: {e2}")
+    def scroll_measure_list_to(self, first):
+        self.measure_list_first = max(0, int(first))
+        self.render_measure_list_rows()
 
+    def on_measure_list_scroll(self, *args):
+        """Commande de la barre de défilement verticale ('moveto' fraction ou 'scroll' n units/pages)."""
+        if not args:
+            return
+        visible_rows = self.get_measure_list_visible_rows()
+        if args[0] == "moveto":
+            self.scroll_measure_list_to(float(args[1]) * len(self.measure_list_order))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (visible_rows if args[2] == "pages" else 1)
+            self.scroll_measure_list_to(self.measure_list_first + step)
+
+    def on_measure_list_wheel(self, event, direction=None):
+        """Molette sur la liste: défile de trois lignes dans toute la liste."""
+        if direction is None:
+            direction = 1 if event.delta > 0 else -1
+        self.scroll_measure_list_to(self.measure_list_first - 3 * direction)
+        return "break"
+
+    def on_measure_list_click(self, event):
+        """Un clic simple sur une ligne remplace toute la sélection, y compris les lignes hors de la fenêtre."""
+        if event.state & 0x0005: # Shift / Control: the Treeview extends the selection
+            return
+        if self.measures_list.identify_region(event.x, event.y) in ("cell", "tree"):
+            self.measure_list_selection = set()
 
-        # Restore selection if possible
-        if selected_iids:
-            # Filter IDs that still exist
-            valid_selection = [iid for iid in selected_iids if self.measures_list.exists(iid)]
-            if valid_selection:
-                try:
-                    self.measures_list.selection_set(valid_selection)
-                    self.measures_list.focus(valid_selection[0])
-                    self.measures_list.see(valid_selection[0])
-                except tk.TclError:
-                     print("Avertissement: Impossible de restaurer la sélection après mise à jour de la liste des mesures.")
+    def move_measure_list_selection(self, step, event=None):
+        """Flèches haut/bas: sélectionne la mesure précédente/suivante dans toute la liste.
+           Avec Shift, la liaison de la classe Treeview étend la sélection (pas de "break")."""
+        if event is not None and event.state & 0x0001: # Shift
+            return None
+        if not self.measure_list_order:
+            return "break"
+        position = self.get_measure_list_position(self.selected_measure_id)
+        position = 0 if position is None else position + step
+        self.select_measure(self.measure_list_order[max(0, min(position, len(self.measure_list_order) - 1))])
+        return "break"
+
+    def scroll_measure_list_to_id(self, measure_id):
+        """Fait défiler la liste pour que la ligne de la mesure soit visible."""
+        position = self.get_measure_list_position(measure_id)
+        if position is None:
+            return
+        visible_rows = self.get_measure_list_visible_rows()
+        if position < self.measure_list_first:
+            self.measure_list_first = position
+        elif position >= self.measure_list_first + visible_rows:
+            self.measure_list_first = position - visible_rows + 1
+
+    def measure_passes_list_filters(self, measure):
+        """Indique si une mesure est retenue par les filtres de page et de produit de la liste."""
+        page_filter = self.measure_page_filter.get()
+        product_filter = self.measure_product_filter.get()
+        if page_filter != "Toutes" and measure.get("page") != int(page_filter) - 1:
+            return False
+        if product_filter == "(aucun)":
+            return not measure.get("product_name")
+        return product_filter == "Tous" or measure.get("product_name") == product_filter
+
+    def insert_measure_row(self, measure):
+        """Ajoute une nouvelle mesure (déjà dans le store) à la liste: en fin de liste dans l'ordre de création,
+           sinon à sa place par recherche dichotomique dans l'ordre trié. Les choix des filtres ne sont
+           recalculés que pour une nouvelle page ou un nouveau produit, et les lignes matérialisées ne sont
+           réécrites que si la mesure tombe dans la fenêtre affichée."""
+        product_name = measure.get("product_name")
+        if (len(self.measures.by_page.get(measure.get("page"), ())) == 1
+                or (product_name and len(self.measures.by_product.get(product_name, ())) == 1)):
+            self.update_measure_list_filters()
+        position = self.place_measure_list_id(measure)
+        if position is None:
+            return
+
+        visible_rows = self.get_measure_list_visible_rows()
+        if position < self.measure_list_first:
+            self.measure_list_first += 1 # Same rows stay in view
+            self.update_measure_list_scrollbar(visible_rows)
+        elif position >= self.measure_list_first + visible_rows + self.MEASURE_LIST_BUFFER_ROWS:
+            self.update_measure_list_scrollbar(visible_rows) # Below the materialized window
+        else:
+            self.render_measure_list_rows()
+
+    def insert_measure_rows(self, measures):
+        """Ajoute un lot de mesures (annulation d'une suppression, etc.) par le même chemin indexé que
+           insert_measure_row: filtres mis à jour une fois, ids placés un à un, fenêtre réaffichée une fois."""
+        self.update_measure_list_filters()
+        first_id = self.measure_list_order[self.measure_list_first] if self.measure_list_first < len(self.measure_list_order) else None
+        for measure in measures:
+            self.place_measure_list_id(measure)
+        if first_id is not None: # The rows in view stay in view
+            self.measure_list_first = self.get_measure_list_position(first_id)
+        self.render_measure_list_rows()
+
+    def place_measure_list_id(self, measure):
+        """Place l'id d'une mesure dans l'ordre affiché: en fin de liste dans l'ordre de création, sinon par
+           recherche dichotomique dans l'ordre trié. Retourne sa position, ou None si les filtres l'excluent."""
+        if not self.measure_passes_list_filters(measure):
+            return None
+        measure_id = measure.get("id")
+        column, descending = self.measure_list_sort
+        if column is None:
+            position = len(self.measure_list_order)
+            self.measure_list_order.append(measure_id)
+            if self.measure_list_positions is not None:
+                self.measure_list_positions[measure_id] = position
+            return position
+        sort_key = self.get_measure_sort_key(column)
+        new_key = sort_key(measure)
+        low, high = 0, len(self.measure_list_order)
+        while low < high: # Bisection on the keys of the already sorted ids (bisect's key= needs Python 3.10)
+            middle = (low + high) // 2
+            middle_key = sort_key(self.measures.get(self.measure_list_order[middle]))
+            if (middle_key > new_key) if descending else (middle_key < new_key):
+                low = middle + 1
+            else:
+                high = middle
+        position = low
+        self.measure_list_order.insert(position, measure_id)
+        self.measure_list_positions = None # Following rows moved down by one
+        return position
+
+    def delete_measure_rows(self, measure_ids):
+        """Retire les mesures données de la liste affichée et de la sélection."""
+        measure_ids = set(measure_ids)
+        self.measure_list_order = [measure_id for measure_id in self.measure_list_order if measure_id not in measure_ids]
+        self.measure_list_positions = None
+        self.measure_list_selection -= measure_ids
+        self.update_measure_list_filters()
+        self.render_measure_list_rows()
+
+    def update_measure_rows(self, measures):
+        """Met à jour les lignes des mesures données (seules les lignes matérialisées sont réécrites)."""
+        for measure in measures:
+            iid = str(measure.get("id"))
+            if self.measures_list.exists(iid):
+                self.measures_list.item(iid, values=self.get_measure_row_values(measure))
 
     # --- AJOUT: Gestion de la sélection de mesure ---
     def on_measure_select(self, event=None):
         """Appelé lorsque la sélection change dans la liste des mesures."""
-        selected_iids = self.measures_list.selection()
-
-        new_selected_id = None
-        if selected_iids:
-            # Prendre le premier sélectionné (Treeview gère la sélection multiple, mais on surligne un seul)
-            selected_iid_str = selected_iids[0]
-            try:
-                # Convertir l'IID (string) en float pour correspondre à l'ID de mesure
-                new_selected_id = float(selected_iid_str)
-            except ValueError:
-                print(f"Erreur: IID de mesure sélectionné invalide '{selected_iid_str}'")
-                new_selected_id = None
+        # Only the materialized rows are in the Treeview: the selection of the other rows is kept as is
+        tree_selection = [int(iid) for iid in self.measures_list.selection() if iid.isdigit()]
+        materialized = {int(iid) for iid in self.measures_list.get_children() if iid.isdigit()}
+        self.measure_list_selection = (self.measure_list_selection - materialized) | set(tree_selection)
+
+        # On surligne une seule mesure: la précédente tant qu'elle reste sélectionnée, sinon la première sélectionnée
+        if self.selected_measure_id in self.measure_list_selection:
+            new_selected_id = self.selected_measure_id
+        elif tree_selection:
+            new_selected_id = tree_selection[0]
+        else:
+            new_selected_id = next(iter(self.measure_list_selection), None)
 
         # Vérifier si la sélection a réellement changé
         if new_selected_id != self.selected_measure_id:
+            # Seules l'ancienne et la nouvelle mesure sélectionnées changent de surbrillance
+            self.set_measure_highlight(self.selected_measure_id, False)
             self.selected_measure_id = new_selected_id
-            # Déclencher un redessin pour appliquer la surbrillance
-            self.redraw_measurements()
+            self.set_measure_highlight(new_selected_id, True)
 
             # Optionnel : Aller à la page de la mesure sélectionnée
-            if new_selected_id is not None:
-                for measure in self.measures:
-                    if measure.get('id') == new_selected_id:
-                        target_page = measure.get('page')
-                        if target_page is not None and target_page != self.current_page:
-                            print(f"Aller à la page {target_page + 1} pour la mesure sélectionnée...")
-                            self.current_page = target_page
-                            self.points = [] # Clear points when changing page
-                            self.cancel_current_measurement()
-                            self.display_page() # Ceci appelle déjà redraw_measurements
-                            self.update_document_info()
-                        break # Sortir de la boucle une fois la mesure trouvée
+            measure = self.measures.get(new_selected_id)
+            if measure is not None:
+                target_page = measure.get('page')
+                if target_page is not None and target_page != self.current_page:
+                    print(f"Aller à la page {target_page + 1} pour la mesure sélectionnée...")
+                    self.current_page = target_page
+                    self.points = [] # Clear points when changing page
+                    self.cancel_current_measurement()
+                    self.display_page() # Ceci appelle déjà redraw_measurements
+                    self.update_document_info()
 
 
     def delete_selected_measure(self):
-        """Supprime la mesure sélectionnée dans le Treeview et la liste interne."""
-        selected_iids = self.measures_list.selection()
-        if not selected_iids:
+        """Supprime les mesures sélectionnées dans la liste (y compris les lignes hors de la partie affichée)."""
+        ids_to_delete = set(self.measure_list_selection)
+        if not ids_to_delete:
             messagebox.showwarning("Sélection requise", "Veuillez sélectionner une mesure à supprimer.", parent=self.root)
             return
 
-        deleted_count = 0
-        remaining_measures = []
-        ids_to_delete_float = set()
-
-        # Convert selected IIDs (strings) to float IDs for matching
-        for iid_str in selected_iids:
-             try:
-                  ids_to_delete_float.add(float(iid_str))
-             except ValueError:
-                  print(f"Avertissement: ID Treeview invalide ignoré: {iid_str}")
-
-        if not ids_to_delete_float: return # No valid IDs selected
 
-
-        # Filter the measures list
-        for measure in self.measures:
-             m_id = measure.get("id")
-             if m_id in ids_to_delete_float:
-                  deleted_count += 1
-             else:
-                  remaining_measures.append(measure)
+        # Only ids present in the store are deleted (O(1) lookup each)
+        ids_to_delete = {m_id for m_id in ids_to_delete if m_id in self.measures}
+        deleted_count = len(ids_to_delete)
 
         if deleted_count > 0:
              confirm_msg = f"Supprimer la mesure sélectionnée ?" if deleted_count == 1 else f"Supprimer les {deleted_count} mesures sélectionnées ?"
              if messagebox.askyesno("Confirmation", confirm_msg, parent=self.root):
-                 self.measures = remaining_measures
-                 # Si la mesure supprimée était celle sélectionnée, désélectionner
-                 if self.selected_measure_id in ids_to_delete_float:
-                      self.selected_measure_id = None
-                 self.update_measures_list() # Update Treeview
-                 self.redraw_measurements() # Redraw canvas
-                 self.status_bar.config(text=f"{deleted_count} mesure(s) supprimée(s).")
-                 self.update_product_totals_display() # <--- AJOUTER CET APPEL
+                 removed = self.remove_measures(ids_to_delete)
+                 self.journal.record("delete", tuple(removed))
+                 self.status_bar.config(text=f"{deleted_count} mesure(s) supprimée(s). (Ctrl+Z pour annuler)")
         else:
              messagebox.showerror("Erreur", "Impossible de trouver les mesures correspondantes à supprimer.", parent=self.root)
 
@@ -4268,11 +6640,14 @@ class MetrePDFApp:
              messagebox.showinfo("Information", "Aucune mesure à effacer.", parent=self.root)
              return
 
-        if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer TOUTES les mesures ?\nCette action est irréversible.", parent=self.root, icon='warning'):
-            self.measures = []
+        if messagebox.askyesno("Confirmation", "Voulez-vous vraiment supprimer TOUTES les mesures ?\n(Edition > Annuler / Ctrl+Z pour revenir en arrière)", parent=self.root, icon='warning'):
+            self.journal.record("delete", tuple(self.measures))
+            self.measures.clear()
+            self.reset_measure_index()
             self.selected_measure_id = None # Reset selection
-            self.update_measures_list() # Update Treeview
+            self.update_measures_list() # The store is empty: the "rebuild" only resets the list (no measure read)
             self.canvas.delete("measurement") # Clear visuals
+            self.measure_items = {}
             self.status_bar.config(text="Toutes les mesures ont été supprimées.")
             self.display_ai_message("system", "Toutes les mesures ont été effacées.")
             self.update_product_totals_display() # <--- AJOUTER CET APPEL
@@ -4286,7 +6661,7 @@ class MetrePDFApp:
              print("[DEBUG] Tentative de mise à jour des unités sans échelle définie.")
 
         target_unit = self.unit_var.get()
-        needs_redraw = False
+        changed_measures = []
 
         for measure in self.measures:
             measure_type = measure.get("type")
@@ -4340,11 +6715,13 @@ class MetrePDFApp:
             if final_display_text != old_display_text:
                 measure["display_text"] = final_display_text
                 measure["unit_at_creation"] = target_unit # Update unit context for future ref?
-                needs_redraw = True
+                changed_measures.append(measure)
 
-        if needs_redraw:
-             self.update_measures_list() # Update Treeview display
-             self.redraw_measurements() # Update canvas display
+        if changed_measures:
+             self.update_measure_rows(changed_measures) # Only the rows whose text changed
+             for measure in changed_measures: # Update canvas display (measures on the current page only)
+                  if measure.get("id") in self.measure_items:
+                       self.refresh_measure_overlay(measure)
              self.status_bar.config(text=f"Affichage mis à jour pour unité: {target_unit}")
              self.update_product_totals_display() # <--- AJOUTER CET APPEL ICI
 
@@ -4372,10 +6749,8 @@ class MetrePDFApp:
             print("[Avertissement] Calcul des totaux impossible: échelle non définie.")
             return None # Retourne None pour indiquer l'échec
 
-        for measure in self.measures:
+        for measure in self.measures.with_product(): # Index des produits: les mesures sans produit ne sont pas parcourues
             product_name = measure.get("product_name")
-            if not product_name:
-                continue # Passer les mesures sans produit associé
 
             measure_type = measure.get("type")
             value_pdf = measure.get("value") # Valeur en unités PDF ou degrés
@@ -4712,34 +7087,50 @@ class MetrePDFApp:
             self.display_detected_lines()
         else:
             self.canvas.delete("detected_lines")
+            self.line_tile_items = {}
 
     def display_detected_lines(self):
-        """Affiche les lignes détectées sur le canvas pour la page courante."""
+        """Affiche les lignes détectées de la page courante sous forme d'une couche bitmap RGBA
+           semi-transparente, découpée en tuiles comme la page: le nombre d'éléments du canvas
+           ne dépend que de la taille de la vue, pas du nombre de segments."""
+        self.canvas.delete("detected_lines") # Clear previous layer
+        self.line_tile_items = {}
+        self.update_detected_lines_tiles()
+
+    def update_detected_lines_tiles(self):
+        """Affiche les tuiles de la couche des lignes détectées qui recouvrent la vue."""
         if not self.pdf_document or not self.show_detected_lines.get():
             return
+        if not len(self.lines_by_page.get(self.current_page, EMPTY_SEGMENTS)):
+            return
+        line_index = self.get_page_line_index(self.current_page)
 
-        self.canvas.delete("detected_lines") # Clear previous lines
-
-        lines_to_draw = self.lines_by_page.get(self.current_page, [])
-        if not lines_to_draw:
-             return
-
-        # Use same factor as page display
+        # Use same factor and tile grid as page display
         display_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
-        line_color = "#ADD8E6" # Light blue for detected lines
-
-        for line in lines_to_draw:
-            (x0_pdf, y0_pdf), (x1_pdf, y1_pdf) = line
-            # Convert PDF points to display coords
-            x0_disp, y0_disp = x0_pdf * display_resolution_factor, y0_pdf * display_resolution_factor
-            x1_disp, y1_disp = x1_pdf * display_resolution_factor, y1_pdf * display_resolution_factor
-
-            self.canvas.create_line(x0_disp, y0_disp, x1_disp, y1_disp,
-                                  fill=line_color, width=1, dash=(1, 3), # Dotted line
-                                  tags="detected_lines")
-        # Ensure lines are drawn below measurements
-        self.canvas.tag_lower("detected_lines", "measurement")
-
+        zoom_level = tile_zoom_key(display_resolution_factor)
+        tx0, ty0, tx1, ty1 = self.get_visible_tile_range(display_resolution_factor)
+        visible = {(tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)}
+
+        for tile in list(self.line_tile_items):
+            if tile not in visible:
+                self.canvas.delete(self.line_tile_items.pop(tile))
+
+        for tile_x, tile_y in sorted(visible - set(self.line_tile_items)):
+            key = (self.current_page, zoom_level, tile_x, tile_y)
+            photo = self.line_tile_cache.get(key)
+            if photo is None:
+                img = render_lines_tile(line_index, display_resolution_factor, tile_x, tile_y)
+                # Empty tiles are cached too (as False) so they are not redrawn on every scroll
+                photo = ImageTk.PhotoImage(image=img) if img is not None else False
+                self.line_tile_cache.put(key, photo, TILE_SIZE if img else 1, TILE_SIZE if img else 1)
+            if photo:
+                self.line_tile_items[(tile_x, tile_y)] = self.canvas.create_image(
+                    tile_x * TILE_SIZE, tile_y * TILE_SIZE, image=photo, anchor=tk.NW, tags="detected_lines")
+        self.line_tile_cache.touch((self.current_page, zoom_level, tx, ty) for tx, ty in self.line_tile_items)
+
+        # Ensure lines are drawn above the page but below measurements
+        if self.canvas.find_withtag("measurement"):
+            self.canvas.tag_lower("detected_lines", "measurement")
 
     # --- Navigation & Zoom ---
 
@@ -4761,28 +7152,73 @@ class MetrePDFApp:
             self.display_page()
             self.update_document_info()
 
+    def apply_zoom(self, new_zoom, anchor_x=None, anchor_y=None):
+        """Applique un nouveau facteur de zoom par le chemin rapide: les éléments du canvas sont mis à
+           l'échelle (canvas.scale) et les tuiles affichées sont rééchantillonnées, puis la page est
+           redessinée à la bonne résolution quand le zoom est stable (ZOOM_REFINE_DELAY_MS).
+           anchor_x/anchor_y: position écran (dans le canvas) qui reste fixe, par défaut le centre de la vue."""
+        min_zoom = 0.05
+        new_zoom = max(new_zoom, min_zoom)
+        if abs(self.zoom_factor - new_zoom) <= 1e-6: # Avoid redraw if no change
+            return
+
+        old_resolution_factor = max(self.zoom_factor, 1.0) * 1.5
+        new_resolution_factor = max(new_zoom, 1.0) * 1.5
+        self.zoom_factor = new_zoom
+        self.zoom_level.config(text=f"{int(self.zoom_factor * 100)}%")
+        # Scale info display doesn't change with zoom (it shows absolute scale)
+        ratio = new_resolution_factor / old_resolution_factor
+        self.invalidate_snap_cache()
+        if abs(ratio - 1.0) < 1e-9:
+            return # Below 100% the page is displayed at the same resolution
+
+        if anchor_x is None:
+            anchor_x = self.canvas.winfo_width() / 2
+        if anchor_y is None:
+            anchor_y = self.canvas.winfo_height() / 2
+        anchor_canvas_x = self.canvas.canvasx(anchor_x)
+        anchor_canvas_y = self.canvas.canvasy(anchor_y)
+
+        # Tiles are bitmaps that canvas.scale can't resize: the ones on screen when the fast zoom starts are
+        # assembled once and resampled at each step until the refine, over the preview
+        if self._zoom_refine_job is None:
+            self.zoom_snapshot = self.capture_zoom_snapshot(old_resolution_factor)
+        self.canvas.delete("page_image")
+        self.tile_items = {}
+        self.canvas.delete("detected_lines")
+        self.line_tile_items = {}
+        if self._zoom_refine_job is not None:
+            self.root.after_cancel(self._zoom_refine_job)
+        self._zoom_refine_job = self.root.after(self.ZOOM_REFINE_DELAY_MS, self.refine_zoom)
+
+        # Vector items (page sheet, measurements, detected lines, temporary drawing) follow the zoom
+        self.canvas.scale("all", 0, 0, ratio, ratio)
+        page_rect = self.pdf_document[self.current_page].rect
+        page_width = int(math.ceil(page_rect.width * new_resolution_factor))
+        page_height = int(math.ceil(page_rect.height * new_resolution_factor))
+        self.canvas.config(scrollregion=(0, 0, page_width, page_height))
+
+        # Keep the anchor point under the cursor
+        if page_width > 0:
+            self.canvas.xview_moveto((anchor_canvas_x * ratio - anchor_x) / page_width)
+        if page_height > 0:
+            self.canvas.yview_moveto((anchor_canvas_y * ratio - anchor_y) / page_height)
+        self.schedule_tile_update()
+
+    def refine_zoom(self):
+        """Redessine la page et les mesures à la résolution du zoom courant (fin du zoom rapide)."""
+        self._zoom_refine_job = None
+        self.display_page()
+
     def zoom_in(self, factor=1.2):
         """Augmente le zoom."""
         if not self.pdf_document: return
-        self.zoom_factor *= factor
-        self.zoom_level.config(text=f"{int(self.zoom_factor * 100)}%")
-        # Scale info display doesn't change with zoom (it shows absolute scale)
-        # self.update_scale_info_display() # No need to update scale label on zoom
-        self.display_page() # Redraw page and measurements at new zoom
+        self.apply_zoom(self.zoom_factor * factor)
 
     def zoom_out(self, factor=1.2):
         """Diminue le zoom."""
         if not self.pdf_document: return
-        new_zoom = self.zoom_factor / factor
-        # Add a minimum zoom level to prevent issues
-        min_zoom = 0.05
-        if new_zoom < min_zoom:
-             new_zoom = min_zoom
-        if abs(self.zoom_factor - new_zoom) > 1e-6: # Avoid redraw if no change
-             self.zoom_factor = new_zoom
-             self.zoom_level.config(text=f"{int(self.zoom_factor * 100)}%")
-             # self.update_scale_info_display() # No need here either
-             self.display_page()
+        self.apply_zoom(self.zoom_factor / factor)
 
     def zoom_fit(self):
         """Ajuste le zoom pour adapter la page à la fenêtre."""
@@ -4822,11 +7258,7 @@ class MetrePDFApp:
         min_zoom = 0.05
         if new_zoom_factor < min_zoom: new_zoom_factor = min_zoom
 
-        if abs(self.zoom_factor - new_zoom_factor) > 1e-6:
-             self.zoom_factor = new_zoom_factor
-             self.zoom_level.config(text=f"{int(self.zoom_factor * 100)}%")
-             # self.update_scale_info_display()
-             self.display_page()
+        self.apply_zoom(new_zoom_factor)
 
 
     def on_mousewheel(self, event, delta_override=None):
@@ -4850,49 +7282,13 @@ class MetrePDFApp:
         if delta == 0: return # No scroll detected
 
         # --- Zoom Centered on Cursor ---
-        # 1. Get canvas coordinates under cursor BEFORE zoom
-        x_canvas_before, y_canvas_before = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-
-        # 2. Apply zoom
+        # Each notch only scales the canvas items; the page is re-rendered once the wheel goes quiet
         zoom_amount = 1.15 # Smaller zoom step for mouse wheel
-        old_zoom_factor = self.zoom_factor # Store old zoom factor
         if delta > 0:
-             self.zoom_factor *= zoom_amount
-        elif delta < 0:
+             new_zoom = self.zoom_factor * zoom_amount
+        else:
              new_zoom = self.zoom_factor / zoom_amount
-             min_zoom = 0.05
-             self.zoom_factor = max(new_zoom, min_zoom)
-
-        # Only proceed if zoom actually changed
-        if abs(self.zoom_factor - old_zoom_factor) > 1e-6:
-            self.zoom_level.config(text=f"{int(self.zoom_factor * 100)}%")
-            self.display_page() # Redraw page and measurements at new zoom
-
-            # ---> AJOUT CRUCIAL <---
-            # Force Tkinter à traiter les mises à jour d'affichage/géométrie
-            # avant de recalculer les coordonnées.
-            self.root.update_idletasks()
-            # ----------------------
-
-            # 3. Get canvas coordinates under cursor AFTER redraw AND update
-            x_canvas_after, y_canvas_after = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-
-            # 4. Calculate scroll amount needed
-            scroll_x = x_canvas_after - x_canvas_before
-            scroll_y = y_canvas_after - y_canvas_before
-
-            # 5. Apply scroll (only if the scroll amount is significant)
-            # Convertir en entier est nécessaire pour view_scroll, mais vérifions si c'est >= 1
-            scroll_x_int = int(scroll_x)
-            scroll_y_int = int(scroll_y)
-
-            if abs(scroll_x_int) >= 1:
-                self.canvas.xview_scroll(scroll_x_int, "units")
-            if abs(scroll_y_int) >= 1:
-                self.canvas.yview_scroll(scroll_y_int, "units")
-
-        # Optionnel: Mettre à jour la barre de statut ou autre feedback
-        # self.status_bar.config(text=f"Zoom: {int(self.zoom_factor*100)}%")
+        self.apply_zoom(new_zoom, event.x, event.y)
 
 
     # --- Mode Setting ---
@@ -4981,6 +7377,9 @@ class MetrePDFApp:
         # --- Menu Edition ---
         edit_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="Edition", menu=edit_menu)
+        edit_menu.add_command(label="Annuler", command=self.undo, accelerator="Ctrl+Z")
+        edit_menu.add_command(label="Rétablir", command=self.redo, accelerator="Ctrl+Y")
+        edit_menu.add_separator()
         edit_menu.add_command(label="Annuler Mesure en Cours", command=self.cancel_current_measurement, accelerator="Esc")
         edit_menu.add_separator()
         edit_menu.add_command(label="Supprimer Mesure(s) Sélectionnée(s)", command=self.delete_selected_measure, accelerator="Suppr")
@@ -5045,10 +7444,56 @@ class MetrePDFApp:
         self.root.bind("<F7>", lambda e: self.set_mode("angle"))
 
         self.root.bind("<Delete>", lambda e: self.delete_selected_measure())
+        self.root.bind("<Control-z>", lambda e: self.undo(e))
+        self.root.bind("<Control-y>", lambda e: self.redo(e))
+        self.root.bind("<Control-Z>", lambda e: self.redo(e)) # Ctrl+Shift+Z
         self.root.bind("<Escape>", self.cancel_current_measurement)
         self.root.bind("<Return>", lambda e: self.finalize_shape_if_possible()) # Enter to finalize shape
 
 
+    def undo(self, event=None):
+        """Annule la dernière modification du journal (ajout, suppression, calibration)."""
+        if event is not None and isinstance(self.root.focus_get(), (tk.Entry, tk.Text, ttk.Entry)):
+            return # Ctrl+Z in a text field belongs to the field
+        entry = self.journal.undo()
+        if entry is None:
+            self.status_bar.config(text="Rien à annuler.")
+            return
+        self.apply_journal_entry(entry, undo=True)
+
+    def redo(self, event=None):
+        """Rétablit la dernière modification annulée."""
+        if event is not None and isinstance(self.root.focus_get(), (tk.Entry, tk.Text, ttk.Entry)):
+            return
+        entry = self.journal.redo()
+        if entry is None:
+            self.status_bar.config(text="Rien à rétablir.")
+            return
+        self.apply_journal_entry(entry, undo=False)
+
+    def apply_journal_entry(self, entry, undo):
+        """Applique une entrée du journal dans un sens ou dans l'autre, par les chemins incrémentaux
+           (store, index spatial, canvas et liste): le coût ne dépend que des mesures de l'entrée.
+           Exception: une entrée "scale" recalcule le texte de toutes les mesures, comme la calibration
+           elle-même (update_measurements_display_units, O(N))."""
+        kind = entry[0]
+        action = "Annulé" if undo else "Rétabli"
+        if kind in ("add", "delete"):
+            records = entry[1]
+            if (kind == "add") == undo:
+                self.remove_measures({record["id"] for record in records})
+            else:
+                self.insert_measures([record for record in records if record["id"] not in self.measures])
+            label = "ajout" if kind == "add" else "suppression"
+            self.status_bar.config(text=f"{action}: {label} de {len(records)} mesure(s).")
+        elif kind == "scale":
+            self.absolute_scale = entry[1] if undo else entry[2]
+            self.update_scale_info_display()
+            # display_text is read directly by saving, exports, totals and the assistant, so it cannot be
+            # refreshed lazily: only the Treeview rows and overlay items whose text changed are rewritten
+            self.update_measurements_display_units()
+            self.status_bar.config(text=f"{action}: calibration de l'échelle.")
+
     def cancel_current_measurement(self, event=None):
          """Annule la mesure en cours (efface les points temporaires et les visuels)."""
          if self.points: # If a measurement is in progress
@@ -5092,11 +7537,12 @@ class MetrePDFApp:
 
             # --- REVISED: Store PDF points directly ---
             # Measures already contain PDF points if logic was updated correctly
-            measures_to_save = self.measures
+            measures_to_save = self.measures.to_dicts()
+            self.journal.compact()
 
             # Gather project data
             project_data = {
-                "version": "1.2", # Incremented version due to PDF point storage change
+                "version": "1.3", # 1.2: PDF point storage, 1.3: integer measure ids
                 "pdf_path_relative": os.path.relpath(self.pdf_path, os.path.dirname(file_path)), # Store relative path
                 "pdf_path_absolute": self.pdf_path, # Store absolute as fallback
                 "absolute_scale": self.absolute_scale, # meters per PDF point
@@ -5118,7 +7564,9 @@ class MetrePDFApp:
                         "threshold": self.snap_threshold.get(),
                         "endpoints": self.snap_to_endpoints.get(),
                         "midpoints": self.snap_to_midpoints.get(),
-                        "intersections": self.snap_to_intersections.get()
+                        "intersections": self.snap_to_intersections.get(),
+                        "arcs": self.snap_to_arcs.get(),
+                        "measures": self.snap_to_measures.get()
                     }
                 },
                 "product_catalog": self.product_catalog.categories # Embed catalog
@@ -5232,6 +7680,8 @@ class MetrePDFApp:
             self.snap_to_endpoints.set(snapping.get("endpoints", True))
             self.snap_to_midpoints.set(snapping.get("midpoints", True))
             self.snap_to_intersections.set(snapping.get("intersections", True))
+            self.snap_to_arcs.set(snapping.get("arcs", True))
+            self.snap_to_measures.set(snapping.get("measures", True))
 
             # Restore product catalog embedded in the project
             catalog_data = project_data.get("product_catalog")
@@ -5252,7 +7702,14 @@ class MetrePDFApp:
             for measure in loaded_measures:
                 if 'color' not in measure:
                     measure['color'] = None # Add default None if missing
-            self.measures = loaded_measures
+            # Older projects used time.time() floats as ids (fragile float round-trips, possible duplicates)
+            migrated_count = MeasureStore.migrate_ids(loaded_measures)
+            if migrated_count:
+                print(f"Migration: {migrated_count} identifiants de mesures renumérotés (entiers).")
+            self.measures.replace(loaded_measures)
+            self.journal.clear() # History of the previous project does not apply
+            self.update_measures_list() # Bulk rebuild of the list view
+            self.reset_measure_index()
 
 
             # Reset selected measure ID after loading measures
@@ -5288,8 +7745,9 @@ class MetrePDFApp:
             if self.pdf_document: self.pdf_document.close()
             self.pdf_document = None
             self.pdf_path = None
-            self.measures = []
-            self.lines_by_page = {}
+            self.measures.clear()
+            self.reset_measure_index()
+            self.reset_line_cache()
             self.absolute_scale = None
             self.selected_measure_id = None
             self.canvas.delete("all")
@@ -5724,11 +8182,12 @@ GUIDE RAPIDE - TakeOff AI (v1.1 - Totaux Produits)
 4.  **Mesurer**:
     *   Sélectionnez le mode (Distance F2, Surface F3, Périmètre F6, Angle F7).
     *   Cliquez les points sur le plan.
-    *   **Snapping**: Activé par défaut (Config > Accrochage). Pointe vers lignes/points proches.
+    *   **Snapping**: Activé par défaut (Config > Accrochage). Pointe vers lignes/points proches (courbes et arcs compris: centres, quadrants) et vers les sommets/côtés des mesures existantes.
     *   **Ortho**: Maintenir [Shift] pour contraindre horizontal/vertical.
     *   **Finaliser Surface/Périmètre**: Double-clic ou touche [Entrée] ou bouton '✓ Terminer'.
     *   **Annuler Mesure en Cours**: Touche [Échap].
 5.  **Mesures**: Onglet 'Mesures'. Liste des mesures individuelles. Sélectionnez pour surligner sur le plan. Sélectionnez + [Suppr] pour effacer.
+    *   Sur le plan: survolez une mesure pour la repérer, [Ctrl]+clic pour la sélectionner.
 6.  **Catalogue**: Onglet 'Catalogue Produits'. Gérez vos produits/prix/couleurs. Associez-les aux mesures après création (si demandé). La couleur du produit sera appliquée à la mesure. Sauvegarde automatique à la fermeture.
 7.  **Résumé Produits**: Nouvel onglet 'Résumé Produits'. Affiche les totaux de longueurs et surfaces cumulées pour chaque produit associé aux mesures (nécessite une échelle calibrée).
 8.  **Sauvegarder**: Fichier > Enregistrer Projet (Ctrl+S). Sauvegarde PDF lié, mesures, échelle, catalogue actuel, config.
@@ -5790,6 +8249,11 @@ GUIDE RAPIDE - TakeOff AI (v1.1 - Totaux Produits)
         #    if not messagebox.askyesno("Quitter", "Projet non enregistré. Quitter quand même?"):
         #         return # Abort closing
 
+        # Stop the background line extraction, geometry and rendering workers
+        self.cancel_line_extraction(update_status=False)
+        self.shutdown_geometry_executor()
+        self.shutdown_render_executor()
+
         print("[DEBUG] Destruction de la fenêtre principale.")
         # Close PDF document gracefully if open
         if self.pdf_document:
@@ -5821,6 +8285,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the line extraction process pool in frozen (PyInstaller) Windows builds
+    multiprocessing.freeze_support()
     # Ensure AppData path exists early (might be needed by initializers)
     app_data_dir = get_app_data_path()
     print(f"Dossier de données de l'application: {app_data_dir}")